@@ -7,6 +7,8 @@ from .extensions import db, jwt, cors, migrate, cache
 from .celery_app import init_celery       
 from .tasks import *
 from .utils.init_admin import initialize_admin
+from .utils.stats_utils import rebuild_user_stats_command
+from .decorators.auth_decorators import is_token_revoked
 
 
 def create_app():
@@ -31,6 +33,15 @@ def create_app():
         print(f"Missing token: {error}")
         return jsonify({"msg": "Missing Authorization Header"}), 401
 
+    @jwt.token_in_blocklist_loader
+    def check_token_version(jwt_header, jwt_payload):
+        return is_token_revoked(jwt_payload)
+
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        print("Revoked token")
+        return jsonify({"msg": "Token has been revoked"}), 401
+
     cors.init_app(app, resources={r"/api/*": {"origins": app.config['CORS_ORIGINS']}})
     migrate.init_app(app, db)
     cache.init_app(app)
@@ -44,6 +55,8 @@ def create_app():
 
     app.redis_client = redis_instance
 
+    app.cli.add_command(rebuild_user_stats_command)
+
     with app.app_context():
         initialize_admin()
 
@@ -66,6 +79,9 @@ def create_celery(app):
     register_report_tasks(celery_instance)
     register_reminder_tasks(celery_instance)
     register_export_tasks(celery_instance)
+    register_counter_tasks(celery_instance)
+    register_submission_tasks(celery_instance)
+    register_pdf_tasks(celery_instance)
 
     app.celery = celery_instance 
       
@@ -24,6 +24,7 @@ api.add_resource(UserScoresResource, '/user/scores')
 api.add_resource(ExportUserScoresResource, '/user/export')
 api.add_resource(ExportJobStatusResource, '/user/export/status')
 api.add_resource(ExportDownloadResource, '/user/export/download/<int:job_id>')
+api.add_resource(MonthlyReportDownloadResource, '/user/reports/monthly')
 api.add_resource(QuizAvailabilityResource, '/user/take_quiz/<int:quiz_id>/availability')
 api.add_resource(StartQuizResource, '/user/start_quiz/<int:quiz_id>')
 api.add_resource(SubmitQuizResource, '/user/submit_quiz/<int:quiz_id>')
@@ -39,11 +40,15 @@ api.add_resource(ChapterResource, '/admin/chapters/<int:chapter_id>')
 api.add_resource(QuizListResource, '/admin/quiz')
 api.add_resource(QuizResource, '/admin/quizzes/<int:quiz_id>')
 api.add_resource(QuestionListResource, '/admin/quizzes/<int:quiz_id>/questions')
+api.add_resource(QuestionImportResource, '/admin/quizzes/<int:quiz_id>/questions/import')
 api.add_resource(QuestionResource, '/admin/questions/<int:question_id>')
 api.add_resource(UserListResource, '/admin/users')
 api.add_resource(UserResource, '/admin/users/<user_id>')
 api.add_resource(UserStatusResource, '/admin/users/<user_id>/status')
 api.add_resource(AdminSearch, '/admin/search')
+api.add_resource(AdminScoresExportResource, '/admin/exports/scores')
+api.add_resource(AdminExportJobResource, '/admin/exports/<int:job_id>')
+api.add_resource(AdminExportDownloadResource, '/admin/exports/<int:job_id>/download')
 
 def register_api(app):
     app.register_blueprint(api_bp)
\ No newline at end of file
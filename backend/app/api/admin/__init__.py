@@ -5,4 +5,5 @@ from .question import *
 from .users import *
 from .dashboard import*
 from .summary import *
-from .search import *
\ No newline at end of file
+from .search import *
+from .export import *
\ No newline at end of file
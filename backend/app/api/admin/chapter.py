@@ -1,16 +1,18 @@
 from flask import request
 from flask_restful import Resource,  abort
-from app.models import Subject, Chapter
+from app.models import Subject, Chapter, Quiz
 from app.extensions import db
 from app.decorators.auth_decorators import admin_required
 from app.utils.cache_utils import cache_response, invalidate_cache_for_chapters, rate_limit
+from app.utils.stats_utils import rebuild_user_stats, users_with_scores_for
+from app.utils.counter_utils import adjust_counters, chapter_create_deltas, chapter_delete_deltas
 
 
 class AllChaptersResource(Resource):
     method_decorators = [admin_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=120)
+    @cache_response(ttl=120, tags=("subjects", "chapters"), local=True)
     def get(self):
         try:
             chapters = Chapter.query.all()
@@ -31,7 +33,7 @@ class SubjectChapterListResource(Resource):
     method_decorators = [admin_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=120)
+    @cache_response(ttl=120, tags=("subjects", "chapters"))
     def get(self, subject_id):
         try:
             subject = Subject.query.get(subject_id)
@@ -64,9 +66,11 @@ class SubjectChapterListResource(Resource):
             if not name:
                 return {"msg": "Chapter name is required"}, 400
 
+            counter_deltas = chapter_create_deltas(subject.id)
             chapter = Chapter(name=name, description=description, subject_id=subject.id)
             db.session.add(chapter)
             db.session.commit()
+            adjust_counters(**counter_deltas)
 
             invalidate_cache_for_chapters()
 
@@ -79,7 +83,7 @@ class ChapterResource(Resource):
     method_decorators = [admin_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=120)
+    @cache_response(ttl=120, tags=("subjects", "chapters"))
     def get(self, chapter_id):
         try:
             chapter = Chapter.query.get(chapter_id)
@@ -123,8 +127,14 @@ class ChapterResource(Resource):
             if not chapter:
                 abort(404, message="Chapter not found")
 
+            affected_users = users_with_scores_for(
+                quiz_id for quiz_id, in Quiz.query.with_entities(Quiz.id).filter_by(chapter_id=chapter.id)
+            )
+            counter_deltas = chapter_delete_deltas(chapter)
             db.session.delete(chapter)
             db.session.commit()
+            adjust_counters(**counter_deltas)
+            rebuild_user_stats(affected_users)
 
             invalidate_cache_for_chapters()
             
@@ -0,0 +1,76 @@
+import os
+from flask_restful import Resource
+from flask import current_app
+from flask_jwt_extended import get_jwt_identity
+from app.models import ExportJob, ExportStatus, ExportKind
+from app.extensions import db
+from app.decorators.auth_decorators import admin_required
+from app.utils.export_utils import export_path, send_export
+
+
+def serialize_export_job(job):
+    data = {
+        "job_id": job.id,
+        "created_at": job.created_at.isoformat(),
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        **job.progress()
+    }
+    if job.status == ExportStatus.completed:
+        data["download_url"] = f"/admin/exports/{job.id}/download"
+    return data
+
+
+class AdminScoresExportResource(Resource):
+    method_decorators = [admin_required]
+
+    def get(self):
+        try:
+            jobs = (
+                ExportJob.query
+                .filter_by(kind=ExportKind.all_scores)
+                .order_by(ExportJob.created_at.desc())
+                .limit(10)
+                .all()
+            )
+            return [serialize_export_job(job) for job in jobs], 200
+        except Exception as e:
+            return {"msg": f"Error retrieving exports: {str(e)}"}, 500
+
+    def post(self):
+        try:
+            job = ExportJob(user_id=int(get_jwt_identity()), kind=ExportKind.all_scores)
+            db.session.add(job)
+            db.session.commit()
+
+            current_app.celery.send_task('export_all_scores_csv', args=[job.id])
+            return {"msg": "Export started", "job_id": job.id}, 202
+        except Exception as e:
+            db.session.rollback()
+            return {"msg": f"Error starting export: {str(e)}"}, 500
+
+
+class AdminExportJobResource(Resource):
+    method_decorators = [admin_required]
+
+    def get(self, job_id):
+        job = ExportJob.query.filter_by(id=job_id, kind=ExportKind.all_scores).first()
+        if not job:
+            return {"msg": "Export not found"}, 404
+        return serialize_export_job(job), 200
+
+
+class AdminExportDownloadResource(Resource):
+    method_decorators = [admin_required]
+
+    def get(self, job_id):
+        job = ExportJob.query.filter_by(
+            id=job_id, kind=ExportKind.all_scores, status=ExportStatus.completed
+        ).first()
+        if not job:
+            return {"msg": "Export not available"}, 404
+
+        path = export_path(job.filename) if job.filename else None
+        if not path or not os.path.exists(path):
+            return {"msg": "Export expired or not found"}, 404
+
+        return send_export(path, f"all_scores_{job.id}.csv")
@@ -1,16 +1,22 @@
+import csv
+import io
 from flask_restful import Resource, abort
 from flask import request
+from sqlalchemy import insert
 from app.models import Question, Quiz
 from app.extensions import db
 from app.decorators.auth_decorators import admin_required
 from app.utils.cache_utils import cache_response, rate_limit, invalidate_cache_for_questions
+from app.utils.stats_utils import rebuild_user_stats, users_with_scores_for
+from app.utils.counter_utils import adjust_counters
+from app.utils.quiz_cache_utils import invalidate_quiz_content_cache
 
 
 class QuestionListResource(Resource):
     method_decorators = [admin_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=120)
+    @cache_response(ttl=120, tags=("subjects", "chapters", "quizzes", "questions:{quiz_id}"))
     def get(self, quiz_id):
         try:
             quiz = Quiz.query.get(quiz_id)
@@ -56,19 +62,112 @@ class QuestionListResource(Resource):
             )
 
             db.session.add(question)
+            Quiz.query.filter_by(id=quiz_id).update(
+                {Quiz.question_count: Quiz.question_count + 1}, synchronize_session=False
+            )
             db.session.commit()
+            adjust_counters(total_questions=1)
+            # Percentages of earlier attempts depend on the question count
+            rebuild_user_stats(users_with_scores_for([quiz_id]))
             invalidate_cache_for_questions(quiz_id=quiz_id)
+            invalidate_quiz_content_cache(quiz_id)
 
             return {"msg": "Question created", "id": question.id}, 201
         except Exception as e:
             db.session.rollback()
             return {"msg": f"Error creating question: {str(e)}"}, 500
 
+QUESTION_FIELDS = ['question_statement', 'option1', 'option2', 'option3', 'option4', 'correct_option']
+OPTION_MAX_LENGTH = 255
+MAX_IMPORT_QUESTIONS = 1000
+
+
+def read_import_rows():
+    """
+    Question rows from a CSV upload ('file' form field), a text/csv body, or JSON
+    (a list of questions or {"questions": [...]}). CSV files need a header row with QUESTION_FIELDS.
+    """
+    upload = request.files.get('file')
+    if upload is not None or request.mimetype == 'text/csv':
+        raw = upload.read() if upload is not None else request.get_data()
+        return list(csv.DictReader(io.StringIO(raw.decode('utf-8-sig'))))
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('questions')
+    return data
+
+
+def validate_import_rows(quiz_id, rows):
+    """Check every row and collect all problems. Returns (insert mappings, per-row errors)."""
+    mappings, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({"row": number, "errors": {"row": "Expected an object with question fields"}})
+            continue
+
+        values = {field: '' if row.get(field) is None else str(row.get(field)).strip() for field in QUESTION_FIELDS}
+        row_errors = {field: "Required" for field, value in values.items() if not value}
+        for field in ('option1', 'option2', 'option3', 'option4'):
+            if len(values[field]) > OPTION_MAX_LENGTH:
+                row_errors[field] = f"Longer than {OPTION_MAX_LENGTH} characters"
+        if values['correct_option'] and values['correct_option'] not in ('1', '2', '3', '4'):
+            row_errors['correct_option'] = "Must be 1, 2, 3 or 4"
+
+        if row_errors:
+            errors.append({"row": number, "errors": row_errors})
+        else:
+            mappings.append({**values, "quiz_id": quiz_id, "correct_option": int(values['correct_option'])})
+    return mappings, errors
+
+
+class QuestionImportResource(Resource):
+    method_decorators = [admin_required]
+
+    @rate_limit(limit=10, window=60)
+    def post(self, quiz_id):
+        """
+        Add many questions to a quiz in one request. Nothing is inserted unless every row is valid,
+        otherwise the errors are returned per row (numbered from 1, not counting a CSV header).
+        """
+        try:
+            quiz = Quiz.query.get(quiz_id)
+            if not quiz:
+                abort(404, message="Quiz not found")
+
+            try:
+                rows = read_import_rows()
+            except (UnicodeDecodeError, csv.Error) as e:
+                return {"msg": f"Could not read CSV: {str(e)}"}, 400
+            if not isinstance(rows, list) or not rows:
+                return {"msg": "No questions to import"}, 400
+            if len(rows) > MAX_IMPORT_QUESTIONS:
+                return {"msg": f"At most {MAX_IMPORT_QUESTIONS} questions can be imported at once"}, 400
+
+            mappings, errors = validate_import_rows(quiz_id, rows)
+            if errors:
+                return {"msg": "Some questions are invalid, nothing was imported", "errors": errors}, 400
+
+            db.session.execute(insert(Question), mappings)
+            Quiz.query.filter_by(id=quiz_id).update(
+                {Quiz.question_count: Quiz.question_count + len(mappings)}, synchronize_session=False
+            )
+            db.session.commit()
+            adjust_counters(total_questions=len(mappings))
+            rebuild_user_stats(users_with_scores_for([quiz_id]))
+            invalidate_cache_for_questions(quiz_id=quiz_id)
+            invalidate_quiz_content_cache(quiz_id)
+
+            return {"msg": "Questions imported", "count": len(mappings)}, 201
+        except Exception as e:
+            db.session.rollback()
+            return {"msg": f"Error importing questions: {str(e)}"}, 500
+
 class QuestionResource(Resource):
     method_decorators = [admin_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=120)
+    @cache_response(ttl=120, tags=("subjects", "chapters", "quizzes", "questions"))
     def get(self, question_id):
         try:
             question = Question.query.get(question_id)
@@ -108,6 +207,7 @@ class QuestionResource(Resource):
 
             db.session.commit()
             invalidate_cache_for_questions(quiz_id=quiz_id)
+            invalidate_quiz_content_cache(quiz_id)
             return {"msg": "Question updated"}, 200
         except Exception as e:
             db.session.rollback()
@@ -122,8 +222,14 @@ class QuestionResource(Resource):
 
             quiz_id = question.quiz_id
             db.session.delete(question)
+            Quiz.query.filter_by(id=quiz_id).update(
+                {Quiz.question_count: Quiz.question_count - 1}, synchronize_session=False
+            )
             db.session.commit()
+            adjust_counters(total_questions=-1)
+            rebuild_user_stats(users_with_scores_for([quiz_id]))
             invalidate_cache_for_questions(quiz_id=quiz_id)
+            invalidate_quiz_content_cache(quiz_id)
             return {"msg": "Question deleted"}, 200
         except Exception as e:
             db.session.rollback()
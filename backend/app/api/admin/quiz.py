@@ -1,17 +1,20 @@
 from flask import  request
 from flask_restful import Resource, abort
-from app.models import Quiz
+from app.models import Quiz, Chapter
 from app.extensions import db
 from app.decorators.auth_decorators import admin_required
 from datetime import datetime
 from app.utils.cache_utils import cache_response, invalidate_cache_for_quizzes, rate_limit
+from app.utils.stats_utils import rebuild_user_stats, users_with_scores_for
+from app.utils.counter_utils import adjust_counters, quiz_create_deltas, quiz_delete_deltas, quiz_move_deltas
+from app.utils.quiz_cache_utils import invalidate_quiz_content_cache
 
 
 class QuizListResource(Resource):
     method_decorators = [admin_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=120)
+    @cache_response(ttl=120, tags=("subjects", "chapters", "quizzes", "questions"), local=True, early_refresh=True)
     def get(self):
         try:
             quizzes = Quiz.query.all()
@@ -66,6 +69,7 @@ class QuizListResource(Resource):
             if not all([name, chapter_id, date_of_quiz, due_date, time_duration]):
                 return {"msg": "Missing required fields"}, 400
 
+            counter_deltas = quiz_create_deltas(chapter_id)
             quiz = Quiz(
                 name=name,
                 chapter_id=chapter_id,
@@ -76,6 +80,7 @@ class QuizListResource(Resource):
             )
             db.session.add(quiz)
             db.session.commit()
+            adjust_counters(**counter_deltas)
 
             invalidate_cache_for_quizzes()
 
@@ -89,7 +94,7 @@ class QuizResource(Resource):
     method_decorators = [admin_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=120)
+    @cache_response(ttl=120, tags=("subjects", "chapters", "quizzes", "questions"))
     def get(self, quiz_id):
         try:
             quiz = Quiz.query.get(quiz_id)
@@ -107,7 +112,7 @@ class QuizResource(Resource):
                 'time_duration': str(quiz.time_duration),
                 'remarks': quiz.remarks,
                 'date_created': quiz.date_created.isoformat(),
-                'question_count': len(quiz.questions),
+                'question_count': quiz.question_count,
                 'chapter': {
                     'id': chapter.id,
                     'name': chapter.name,
@@ -129,6 +134,16 @@ class QuizResource(Resource):
                 abort(404, message="Quiz not found")
 
             data = request.get_json()
+
+            # Checked before anything changes, a move adjusts the dashboard counters
+            counter_deltas = None
+            chapter_id = data.get('chapter_id', quiz.chapter_id)
+            if chapter_id != quiz.chapter_id:
+                if not isinstance(chapter_id, int) or not Chapter.query.get(chapter_id):
+                    return {"msg": "Chapter not found"}, 404
+                counter_deltas = quiz_move_deltas(quiz, chapter_id)
+                quiz.chapter_id = chapter_id
+
             quiz.name = data.get('name', quiz.name)
             quiz.date_of_quiz = datetime.fromisoformat(data.get('date_of_quiz', quiz.date_of_quiz.isoformat()))
             quiz.due_date = datetime.fromisoformat(data.get('due_date', quiz.due_date.isoformat()))
@@ -136,8 +151,13 @@ class QuizResource(Resource):
             quiz.remarks = data.get('remarks', quiz.remarks)
 
             db.session.commit()
+            if counter_deltas:
+                adjust_counters(**counter_deltas)
+                # Subject-wise stats follow the quiz to its new chapter's subject
+                rebuild_user_stats(users_with_scores_for([quiz_id]))
 
             invalidate_cache_for_quizzes()
+            invalidate_quiz_content_cache(quiz_id)
 
             return {"msg": "Quiz updated"}, 200
         except Exception as e:
@@ -151,9 +171,14 @@ class QuizResource(Resource):
             if not quiz:
                 abort(404, message="Quiz not found")
 
+            affected_users = users_with_scores_for([quiz.id])
+            counter_deltas = quiz_delete_deltas(quiz)
             db.session.delete(quiz)
             db.session.commit()
+            adjust_counters(**counter_deltas)
+            rebuild_user_stats(affected_users)
             invalidate_cache_for_quizzes()
+            invalidate_quiz_content_cache(quiz_id)
 
             return {"msg": "Quiz deleted"}, 200
         except Exception as e:
@@ -1,7 +1,6 @@
 from flask_restful import Resource, reqparse
 from app.models import User, Subject, Quiz, RoleEnum
 from app.decorators.auth_decorators import admin_required
-from sqlalchemy.orm import subqueryload
 
 class AdminSearch(Resource):
     method_decorators = [admin_required]
@@ -49,7 +48,7 @@ class AdminSearch(Resource):
             ]
 
         elif category == "quizzes":
-            quizzes = Quiz.query.options(subqueryload(Quiz.questions)).filter(
+            quizzes = Quiz.query.filter(
                 Quiz.name.ilike(f"%{query}%")
             ).all()
             results = [
@@ -60,7 +59,7 @@ class AdminSearch(Resource):
                     "date_of_quiz": q.date_of_quiz.strftime("%Y-%m-%d") if q.date_of_quiz else None,
                     "due_date": q.due_date.strftime("%Y-%m-%d") if q.due_date else None,
                     "time_duration": q.time_duration.strftime("%H:%M:%S") if q.time_duration else None,
-                    "question_count": len(q.questions)
+                    "question_count": q.question_count
                 }
                 for q in quizzes
             ]
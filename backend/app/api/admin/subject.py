@@ -1,15 +1,17 @@
 from flask import request
 from flask_restful import Resource, abort
-from app.models import Subject
+from app.models import Subject, Chapter, Quiz
 from app.extensions import db
 from app.decorators.auth_decorators import admin_required
 from app.utils.cache_utils import cache_response, rate_limit, invalidate_cache_for_subjects
+from app.utils.stats_utils import rebuild_user_stats, users_with_scores_for
+from app.utils.counter_utils import adjust_counters, subject_delete_deltas
 
 class SubjectListResource(Resource):
     method_decorators = [admin_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=120)
+    @cache_response(ttl=120, tags=("subjects", "chapters"), local=True)
     def get(self):
         try:
             subjects = Subject.query.all()
@@ -47,6 +49,7 @@ class SubjectListResource(Resource):
             subject = Subject(name=name, level=level, description=description)
             db.session.add(subject)
             db.session.commit()
+            adjust_counters(total_subjects=1, subjects_without_chapters=1)
             invalidate_cache_for_subjects()
 
             return {"msg": "Subject created", "id": subject.id}, 201
@@ -58,7 +61,7 @@ class SubjectResource(Resource):
     method_decorators = [admin_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=120)
+    @cache_response(ttl=120, tags=("subjects", "chapters"))
     def get(self, subject_id):
         try:
             subject = Subject.query.get(subject_id)
@@ -110,8 +113,14 @@ class SubjectResource(Resource):
             if not subject:
                 abort(404, message="Subject not found")
 
+            affected_users = users_with_scores_for(
+                quiz_id for quiz_id, in Quiz.query.with_entities(Quiz.id).join(Chapter).filter(Chapter.subject_id == subject.id)
+            )
+            counter_deltas = subject_delete_deltas(subject)
             db.session.delete(subject)
             db.session.commit()
+            adjust_counters(**counter_deltas)
+            rebuild_user_stats(affected_users)
             invalidate_cache_for_subjects()
             return {"msg": "Subject deleted"}, 200
         except Exception as e:
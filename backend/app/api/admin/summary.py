@@ -1,23 +1,18 @@
 from flask_restful import Resource
-from sqlalchemy import func
+from sqlalchemy import func, case
 from datetime import datetime, timedelta
 from app.decorators.auth_decorators import admin_required
-from app.models import Quiz, Score, User
+from app.models import Quiz, Score, User, Chapter, Subject, RoleEnum
 from app.extensions import db
-from sqlalchemy.orm import joinedload
 
 class AdminSummaryAnalyticsResource(Resource):
     method_decorators = [admin_required]
 
     def get(self):
         try:
-            # Get all scores with related quizzes and questions in one go
-            all_scores = db.session.query(Score).options(
-                joinedload(Score.quiz).joinedload(Quiz.questions),
-                joinedload(Score.user)
-            ).all()
+            total_attempts = db.session.query(func.count(Score.id)).scalar()
 
-            if not all_scores:
+            if not total_attempts:
                 return {
                     "charts": {
                         "average_score_per_subject": [],
@@ -35,83 +30,91 @@ class AdminSummaryAnalyticsResource(Resource):
                     "tables": {"leaderboard": []}
                 }, 200
 
-            # --- Helper dicts ---
-            subject_scores = {}
-            quiz_highest = {}
-            quiz_attempts = {}
-            score_dist = {"high": 0, "moderate": 0, "low": 0}
-            subject_attempts = {}
-            leaderboard_stats = {}
-
-            for score in all_scores:
-                quiz = score.quiz
-                subject = quiz.chapter.subject
-                max_score = len(quiz.questions) or 1
-                pct_score = (score.total_scored / max_score) * 100
-
-                # 1. Subject-wise percentage scores
-                subject_scores.setdefault(subject.name, []).append(pct_score)
-
-                # 2. Highest score per quiz (percentage)
-                if quiz.name not in quiz_highest or pct_score > quiz_highest[quiz.name]:
-                    quiz_highest[quiz.name] = pct_score
-
-                # 3. Attempts per quiz
-                quiz_attempts[quiz.name] = quiz_attempts.get(quiz.name, 0) + 1
-
-                # 4. Score distribution by percentage
-                if pct_score >= 80:
-                    score_dist["high"] += 1
-                elif pct_score >= 50:
-                    score_dist["moderate"] += 1
-                else:
-                    score_dist["low"] += 1
-
-                # 5. Attempts per subject
-                subject_attempts[subject.name] = subject_attempts.get(subject.name, 0) + 1
-
-                # 6. Leaderboard percentage aggregation
-                if score.user.role != 'admin':
-                    leaderboard_stats.setdefault(score.user.id, {
-                        "name": score.user.full_name,
-                        "username": score.user.username,
-                        "scores": []
-                    })["scores"].append(pct_score)
+            # Percentage of each attempt, computed in the database (a quiz without questions counts as out of 1)
+            pct_score = case(
+                (Quiz.question_count > 0, Score.total_scored * 100.0 / Quiz.question_count),
+                else_=Score.total_scored * 100.0
+            )
+
+            # 1 & 5. Subject-wise average percentage and attempts
+            subject_rows = (
+                db.session.query(Subject.name, func.avg(pct_score), func.count(Score.id))
+                .select_from(Score)
+                .join(Quiz, Quiz.id == Score.quiz_id)
+                .join(Chapter, Chapter.id == Quiz.chapter_id)
+                .join(Subject, Subject.id == Chapter.subject_id)
+                .group_by(Subject.name)
+                .order_by(Subject.name)
+                .all()
+            )
+
+            # 2 & 3. Highest percentage and attempts per quiz
+            quiz_rows = (
+                db.session.query(Quiz.name, func.max(pct_score), func.count(Score.id))
+                .select_from(Score)
+                .join(Quiz, Quiz.id == Score.quiz_id)
+                .group_by(Quiz.name)
+                .order_by(Quiz.name)
+                .all()
+            )
+
+            # 4. Score distribution by percentage
+            high, moderate, low = (
+                db.session.query(
+                    func.sum(case((pct_score >= 80, 1), else_=0)),
+                    func.sum(case(((pct_score >= 50) & (pct_score < 80), 1), else_=0)),
+                    func.sum(case((pct_score < 50, 1), else_=0))
+                )
+                .select_from(Score)
+                .join(Quiz, Quiz.id == Score.quiz_id)
+                .one()
+            )
+            score_dist = {"high": high or 0, "moderate": moderate or 0, "low": low or 0}
+
+            # 6. Leaderboard (top 5 non-admins by average percentage)
+            average_pct = func.avg(pct_score)
+            leaderboard_rows = (
+                db.session.query(User.full_name, User.username, average_pct, func.count(Score.id))
+                .select_from(Score)
+                .join(Quiz, Quiz.id == Score.quiz_id)
+                .join(User, User.id == Score.user_id)
+                .filter(User.role != RoleEnum.ADMIN)
+                .group_by(User.id, User.full_name, User.username)
+                .order_by(average_pct.desc())
+                .limit(5)
+                .all()
+            )
 
             # Format results
             average_score_per_subject = [
-                {"label": subj, "value": round(sum(scores) / len(scores), 2)}
-                for subj, scores in subject_scores.items()
+                {"label": subject, "value": round(avg, 2)}
+                for subject, avg, _ in subject_rows
             ]
 
             highest_score_per_quiz = [
-                {"label": quiz, "value": round(score, 2)}
-                for quiz, score in quiz_highest.items()
+                {"label": quiz, "value": round(highest, 2)}
+                for quiz, highest, _ in quiz_rows
             ]
 
             attempts_per_quiz = [
                 {"label": quiz, "value": count}
-                for quiz, count in quiz_attempts.items()
+                for quiz, _, count in quiz_rows
             ]
 
             attempts_per_subject = [
                 {"label": subject, "value": count}
-                for subject, count in subject_attempts.items()
+                for subject, _, count in subject_rows
             ]
 
-            # Leaderboard (top 5)
-            leaderboard_data = sorted(
-                [
-                    {
-                        "user": data["name"],
-                        "username": data["username"],
-                        "average_score": round(sum(data["scores"]) / len(data["scores"]), 2),
-                        "quizzes_attempted": len(data["scores"])
-                    }
-                    for data in leaderboard_stats.values()
-                ],
-                key=lambda x: x["average_score"], reverse=True
-            )[:5]
+            leaderboard_data = [
+                {
+                    "user": full_name,
+                    "username": username,
+                    "average_score": round(avg, 2),
+                    "quizzes_attempted": count
+                }
+                for full_name, username, avg, count in leaderboard_rows
+            ]
 
             # --- Attempts Per Day (last 7 days) ---
             last_7_days = datetime.now() - timedelta(days=7)
@@ -4,13 +4,15 @@ from app.models import User, UserStatusEnum, RoleEnum
 from app.extensions import db
 from app.decorators.auth_decorators import admin_required
 from app.utils.cache_utils import cache_response, rate_limit, invalidate_cache_for_users
+from app.utils.counter_utils import user_counter_snapshot, adjust_user_counters
+from app.decorators.auth_decorators import revoke_user_tokens, sync_token_version
 
 
 class UserListResource(Resource):
     method_decorators = [admin_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=120)
+    @cache_response(ttl=120, tags=("users",))
     def get(self):
         try:
             users = User.query.filter(User.role != RoleEnum.ADMIN).all()
@@ -41,7 +43,7 @@ class UserResource(Resource):
     method_decorators = [admin_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=60)
+    @cache_response(ttl=60, tags=("users",))
     def get(self, user_id):
         try:
             user = User.query.get(user_id)
@@ -82,8 +84,12 @@ class UserStatusResource(Resource):
             if new_status not in UserStatusEnum.__members__:
                 return {"msg": "Invalid status. Must be 'ACTIVE' or 'SUSPENDED'"}, 400
 
+            before = user_counter_snapshot(user)
             user.status = UserStatusEnum[new_status]
+            revoke_user_tokens(user)
             db.session.commit()
+            sync_token_version(user.id, user.token_version)
+            adjust_user_counters(before, user_counter_snapshot(user))
 
             invalidate_cache_for_users()
             return {"msg": f"User status updated to {new_status}"}, 200
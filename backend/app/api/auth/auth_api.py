@@ -7,6 +7,8 @@ from app.models import User, UserStatusEnum
 from app.extensions import db
 from app.utils.otp_utils import generate_otp
 from app.utils.cache_utils import *
+from app.utils.counter_utils import user_counter_snapshot, adjust_user_counters
+from app.decorators.auth_decorators import token_claims
 
 
 login_parser = reqparse.RequestParser()
@@ -32,7 +34,7 @@ class LoginResource(Resource):
                 "message": "Account not active or email not verified."
             }, 403
 
-        access_token = create_access_token(identity=str(user.id))
+        access_token = create_access_token(identity=str(user.id), additional_claims=token_claims(user))
         response = {
                 "message": "Login successful",
                 "access_token": access_token,
@@ -81,6 +83,7 @@ class RegisterResource(Resource):
         user.set_password(password)
         db.session.add(user)
         db.session.commit()
+        adjust_user_counters({}, user_counter_snapshot(user))
 
         otp = generate_otp()
         set_otp(user.id, otp)
@@ -116,9 +119,11 @@ class VerifyEmailResource(Resource):
         if not user:
             return {"message": "User not found."}, 404
 
+        counters_before = user_counter_snapshot(user)
         user.is_verified = True
         user.status = UserStatusEnum.ACTIVE
         db.session.commit()
+        adjust_user_counters(counters_before, user_counter_snapshot(user))
         delete_otp(user_id)
 
         return {"message": "Email verified successfully."}, 200
@@ -5,4 +5,5 @@ from .settings import *
 from .quiz import *
 from .scores import *
 from .export_resource import *
-from .take_quiz import *
\ No newline at end of file
+from .take_quiz import *
+from .report import *
\ No newline at end of file
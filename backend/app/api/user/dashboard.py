@@ -1,25 +1,14 @@
 from flask_restful import Resource
-from flask_jwt_extended import  get_jwt_identity
-from flask import abort
-from app.decorators import verified_and_active_user_required
-from app.models import User, Score, Quiz
+from app.decorators import verified_and_active_user_required, get_current_user_or_abort
+from app.models import Quiz, UserStatsAggregate
 from datetime import datetime
 
 class UserDashboardResource(Resource):
     method_decorators = [verified_and_active_user_required]
     
     def get(self):
-        try:
-            user_id = get_jwt_identity()
-        except Exception as e:
-            print("JWT extraction error:", e)
-            abort(422, "Invalid JWT")
-        
-        user = User.query.get(user_id)
-        if not user:
-            abort(404, message="User not found")
-
-        scores = Score.query.filter_by(user_id=user_id).all()
+        user = get_current_user_or_abort(require_verified=True)
+        stats = UserStatsAggregate.query.get(user.id)
 
         # Upcoming quizzes
         upcoming_quizzes = Quiz.query\
@@ -34,12 +23,12 @@ class UserDashboardResource(Resource):
             "subject": quiz.chapter.subject.name,
             "date_of_quiz": quiz.date_of_quiz.strftime('%d %b %Y') if quiz.date_of_quiz else None,
             "time_duration": str(quiz.time_duration),
-            "question_count": len(quiz.questions),
+            "question_count": quiz.question_count,
             "due_date": quiz.due_date.strftime('%d %b %Y') if quiz.due_date else None
         } for quiz in upcoming_quizzes]
 
 
-        if not scores:
+        if not stats or not stats.attempt_count:
             return {
                 "full_name": user.full_name,
                 "total_quizzes_attempted": 0,
@@ -53,32 +42,17 @@ class UserDashboardResource(Resource):
                 }
             }, 200
 
-        total_quizzes_attempted = len(scores)
-        percentage_scores = []
-        for score in scores:
-            quiz = Quiz.query.get(score.quiz_id)
-            max_score = len(quiz.questions)
-            if max_score > 0:
-                percentage = (score.total_scored / max_score) * 100
-                percentage_scores.append((score, percentage))
-            else:
-                percentage_scores.append((score, 0))
-                
-        average_score = round(sum(p for _, p in percentage_scores) / total_quizzes_attempted, 2)
+        total_quizzes_attempted = stats.attempt_count
+        average_score = round(stats.percentage_sum / total_quizzes_attempted, 2)
 
-        # Last quiz info (sorted by time)
-        last_score, last_percentage = sorted(percentage_scores, key=lambda x: x[0].time_stamp_of_attempt, reverse=True)[0]
-        last_quiz = Quiz.query.get(last_score.quiz_id)
+        # Last quiz info
+        last_quiz = stats.last_quiz
 
         # Performance breakdown based on percentage
-        high = sum(1 for _, p in percentage_scores if p >= 80)
-        moderate = sum(1 for _, p in percentage_scores if 40 <= p < 80)
-        low = sum(1 for _, p in percentage_scores if p < 40)
-
         performance_breakdown = {
-            "high": high,
-            "moderate": moderate,
-            "low": low
+            "high": stats.high_count,
+            "moderate": stats.moderate_count,
+            "low": stats.low_count
         }
 
         return {
@@ -87,9 +61,9 @@ class UserDashboardResource(Resource):
             "average_score": average_score,
             "last_quiz": {
                 "quiz_name": last_quiz.name,
-                "score": round(last_percentage, 2),
-                "date": last_score.time_stamp_of_attempt.strftime('%d %b %Y') if last_score.time_stamp_of_attempt else None
-            },
+                "score": round(stats.last_percentage, 2),
+                "date": stats.last_attempt_at.strftime('%d %b %Y') if stats.last_attempt_at else None
+            } if last_quiz else None,
             "upcoming_quizzes": upcoming_data,
             "performance_breakdown": performance_breakdown
         }
\ No newline at end of file
@@ -1,9 +1,10 @@
+import os
 from flask_restful import Resource
-from flask import Response
-from app.models import ExportJob, ExportStatus
+from app.models import ExportJob, ExportStatus, ExportKind
 from app.extensions import db
 from flask import current_app
 from app.decorators.auth_decorators import verified_and_active_user_required, get_current_user_or_abort
+from app.utils.export_utils import export_path, send_export
 
 class ExportUserScoresResource(Resource):
     method_decorators = [verified_and_active_user_required]
@@ -27,7 +28,7 @@ class ExportJobStatusResource(Resource):
         user = get_current_user_or_abort(require_verified=True)
         job = (
             ExportJob.query
-            .filter_by(user_id=user.id)
+            .filter_by(user_id=user.id, kind=ExportKind.user_scores)
             .order_by(ExportJob.created_at.desc())
             .first()
         )
@@ -35,7 +36,6 @@ class ExportJobStatusResource(Resource):
             return {"status": "none"}
 
         if job.status == ExportStatus.completed:
-            # Return download URL for Redis
             return {
                 "status": job.status.value,
                 "download_url": f"/user/export/download/{job.id}"
@@ -50,21 +50,14 @@ class ExportDownloadResource(Resource):
     def get(self, job_id):
         user = get_current_user_or_abort(require_verified=True)
 
-        job = ExportJob.query.filter_by(id=job_id, user_id=user.id, status=ExportStatus.completed).first()
+        job = ExportJob.query.filter_by(
+            id=job_id, user_id=user.id, kind=ExportKind.user_scores, status=ExportStatus.completed
+        ).first()
         if not job:
             return {"message": "Export not available"}, 403
 
-        redis_key = f"user_export:{job_id}"
-        csv_data = current_app.redis_client.get(redis_key)
-        if not csv_data:
+        path = export_path(job.filename) if job.filename else None
+        if not path or not os.path.exists(path):
             return {"message": "Export expired or not found"}, 404
 
-        csv_str = csv_data.encode('utf-8')
-
-        return Response(
-            csv_str,
-            mimetype="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename=quiz_export_{user.id}.csv"
-            }
-        )
+        return send_export(path, f"quiz_export_{user.id}.csv")
@@ -8,7 +8,7 @@ class UserProfileResource(Resource):
     method_decorators = [verified_and_active_user_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=60, user_scope=True)
+    @cache_response(ttl=60, user_scope=True, tags=("users",))
     def get(self):
         user = get_current_user_or_abort()
 
@@ -1,6 +1,6 @@
 from flask_restful import Resource
 from app.models import Quiz, Chapter
-from app.decorators import get_current_user_or_abort, verified_and_active_user_required
+from app.decorators import verified_and_active_user_required
 from app.utils.cache_utils import cache_response, rate_limit
 from sqlalchemy.orm import joinedload
 
@@ -8,9 +8,8 @@ class UserQuizListResource(Resource):
     method_decorators = [verified_and_active_user_required]
 
     @rate_limit(limit=100, window=60)
-    @cache_response(ttl=120)
+    @cache_response(ttl=120, tags=("subjects", "chapters", "quizzes"), early_refresh=True)
     def get(self):
-        user = get_current_user_or_abort()
         quizzes = (
             Quiz.query
             .options(
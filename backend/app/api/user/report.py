@@ -0,0 +1,28 @@
+import os
+from flask import send_file
+from flask_restful import Resource
+from app.models import MonthlyReport
+from app.decorators import get_current_user_or_abort, verified_and_active_user_required
+from app.utils.report_utils import report_pdf_path
+
+class MonthlyReportDownloadResource(Resource):
+    method_decorators = [verified_and_active_user_required]
+
+    def get(self):
+        """The user's latest monthly report, served from the stored PDF."""
+        user = get_current_user_or_abort(require_verified=True)
+
+        report = MonthlyReport.query.get(user.id)
+        if not report:
+            return {"message": "No monthly report available yet"}, 404
+
+        path = report_pdf_path(report.pdf_key)
+        if not os.path.exists(path):
+            return {"message": "Monthly report not found"}, 404
+
+        return send_file(
+            path,
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=f"monthly_report_{report.month}.pdf"
+        )
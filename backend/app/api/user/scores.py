@@ -1,11 +1,13 @@
 from flask_restful import Resource
 from sqlalchemy.orm import joinedload
 from app.decorators import get_current_user_or_abort, verified_and_active_user_required
+from app.utils.cache_utils import cache_response
 from app.models import Score, Quiz, Chapter
 
 class UserScoresResource(Resource):
     method_decorators = [verified_and_active_user_required]
 
+    @cache_response(ttl=300, user_scope=True, tags=("subjects", "chapters", "quizzes", "questions"))
     def get(self):
         user = get_current_user_or_abort(require_verified=True)
 
@@ -16,9 +18,7 @@ class UserScoresResource(Resource):
                 .options(
                     joinedload(Score.quiz)
                         .joinedload(Quiz.chapter)
-                        .joinedload(Chapter.subject),
-                    joinedload(Score.quiz)
-                        .joinedload(Quiz.questions)
+                        .joinedload(Chapter.subject)
                 )
                 .order_by(Score.time_stamp_of_attempt.desc())
                 .all()
@@ -39,7 +39,7 @@ class UserScoresResource(Resource):
                     "time_stamp_of_attempt": score.time_stamp_of_attempt.isoformat() if score.time_stamp_of_attempt else None,
                     "total_scored": score.total_scored,
                     "time_taken": score.time_taken,
-                    "total_questions": len(quiz.questions) if quiz and quiz.questions else 0,
+                    "total_questions": quiz.question_count if quiz else 0,
                 })
 
             return {"scores": result}, 200
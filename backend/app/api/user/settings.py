@@ -3,9 +3,11 @@ from flask_restful import Resource
 from app.utils.otp_utils import generate_otp
 from app.utils.cache_utils import *
 from app.extensions import db
-from app.decorators import verified_and_active_user_required, get_current_user_or_abort
+from app.decorators import verified_and_active_user_required, get_current_user_or_abort, sync_token_version
 from datetime import time, datetime
 from app.utils.cache_utils import rate_limit, invalidate_user_profile_cache
+from app.utils.leaderboard_utils import remove_from_leaderboard
+from app.utils.counter_utils import user_counter_snapshot, adjust_user_counters
 
 class UserSettingsResource(Resource):
     method_decorators = [verified_and_active_user_required]
@@ -133,8 +135,12 @@ class AccountDeletionResource(Resource):
             return {"error": "Invalid or expired OTP."}, 400
 
         delete_otp(user.id)
+        counters_before = user_counter_snapshot(user)
         db.session.delete(user)
         db.session.commit()
+        sync_token_version(user.id)
+        adjust_user_counters(counters_before, {})
         invalidate_user_profile_cache(user.id)
+        remove_from_leaderboard(user.id)
 
         return {"message": "Your account has been deleted."}, 200
@@ -1,12 +1,13 @@
 from flask import jsonify
 from flask_restful import Resource
-from flask_jwt_extended import get_jwt_identity
 from sqlalchemy import func, desc
 from datetime import datetime, timedelta
 
-from app.models import User, Score
+from app.models import Score, Quiz, Subject, UserStatsAggregate, UserSubjectStats
 from app.extensions import db
-from app.decorators import verified_and_active_user_required
+from app.decorators import verified_and_active_user_required, get_current_user_or_abort
+from app.utils.stats_utils import score_percentage
+from app.utils.leaderboard_utils import get_user_rank, get_top_users
 
 
 class UserSummaryAnalyticsResource(Resource):
@@ -14,11 +15,11 @@ class UserSummaryAnalyticsResource(Resource):
 
     def get(self):
         try:
-            user_id = int(get_jwt_identity())
-            user = User.query.get(user_id)
-            scores = Score.query.filter_by(user_id=user_id).order_by(Score.time_stamp_of_attempt).all()
+            user = get_current_user_or_abort(require_verified=True)
+            user_id = user.id
+            stats = UserStatsAggregate.query.get(user_id)
 
-            if not scores:
+            if not stats or not stats.attempt_count:
                 return jsonify({
                     "full_name": user.full_name,
                     "score_trend": [],
@@ -34,66 +35,55 @@ class UserSummaryAnalyticsResource(Resource):
                     "leaderboard": []
                 })
 
-            # Score Trend
-            score_trend = []
-            percentage_scores = []
-            subject_stats = {}
-            high = moderate = low = 0
-            total_time = 0
-
-            for s in scores:
-                quiz = s.quiz
-                max_score = len(quiz.questions) or 1
-                percentage = (s.total_scored / max_score) * 100
-                percentage_scores.append((s, percentage))
-
-                # Trend
-                score_trend.append({
-                    "date": s.time_stamp_of_attempt.date().isoformat(),
-                    "score": round(percentage, 2)
-                })
+            # Score Trend (only the columns needed for the chart)
+            trend_rows = (
+                db.session.query(Score.time_stamp_of_attempt, Score.total_scored, Quiz.question_count)
+                .join(Quiz, Quiz.id == Score.quiz_id)
+                .filter(Score.user_id == user_id)
+                .order_by(Score.time_stamp_of_attempt)
+                .all()
+            )
+            score_trend = [
+                {
+                    "date": attempted_at.date().isoformat(),
+                    "score": round(score_percentage(total_scored, max_score), 2)
+                }
+                for attempted_at, total_scored, max_score in trend_rows
+            ]
+
+            # Distribution
+            score_distribution = {
+                "high": stats.high_count,
+                "moderate": stats.moderate_count,
+                "low": stats.low_count
+            }
 
-                # Distribution
-                if percentage >= 80:
-                    high += 1
-                elif percentage >= 40:
-                    moderate += 1
-                else:
-                    low += 1
-
-                # Subject performance
-                subject = quiz.chapter.subject
-                if subject.id not in subject_stats:
-                    subject_stats[subject.id] = {
-                        "name": subject.name,
-                        "total_percentage": 0,
-                        "count": 0
-                    }
-                subject_stats[subject.id]["total_percentage"] += percentage
-                subject_stats[subject.id]["count"] += 1
-
-                # Time
-                total_time += s.time_taken
-
-            score_distribution = {"high": high, "moderate": moderate, "low": low}
+            # Subject performance
+            subject_stats = (
+                db.session.query(Subject.name, UserSubjectStats.percentage_sum, UserSubjectStats.attempt_count)
+                .join(Subject, Subject.id == UserSubjectStats.subject_id)
+                .filter(UserSubjectStats.user_id == user_id, UserSubjectStats.attempt_count > 0)
+                .order_by(Subject.id)
+                .all()
+            )
 
             subject_performance = [
                 {
-                    "label": data["name"],
-                    "value": round(data["total_percentage"] / data["count"], 2)
+                    "label": name,
+                    "value": round(total_percentage / count, 2)
                 }
-                for data in subject_stats.values()
+                for name, total_percentage, count in subject_stats
             ]
 
-            best_subject = max(subject_stats.items(), key=lambda x: x[1]["total_percentage"] / x[1]["count"])[1]["name"]
-            weak_subject = min(subject_stats.items(), key=lambda x: x[1]["total_percentage"] / x[1]["count"])[1]["name"]
-            most_attempted_subject = max(subject_stats.items(), key=lambda x: x[1]["count"])[1]["name"]
+            best_subject = max(subject_stats, key=lambda x: x[1] / x[2])[0] if subject_stats else None
+            weak_subject = min(subject_stats, key=lambda x: x[1] / x[2])[0] if subject_stats else None
+            most_attempted_subject = max(subject_stats, key=lambda x: x[2])[0] if subject_stats else None
 
-            average_time = round(total_time / len(scores), 2)
+            average_time = round(stats.total_time_taken / stats.attempt_count, 2)
 
             attempts_per_subject = [
-                {"label": data["name"], "value": data["count"]}
-                for data in subject_stats.values()
+                {"label": name, "value": count}
+                for name, _, count in subject_stats
             ]
 
             # Weekly Attempts
@@ -112,50 +102,31 @@ class UserSummaryAnalyticsResource(Resource):
             ]
 
             # User Rank (average percentage-based)
-            all_user_scores = Score.query.join(User).filter(User.role != "admin").all()
-            user_avg_percent = {}
-
-            for s in all_user_scores:
-                quiz = s.quiz
-                max_score = len(quiz.questions) or 1
-                pct = (s.total_scored / max_score) * 100
-                user_avg_percent.setdefault(s.user_id, []).append(pct)
-
-            user_avg_percent = {
-                uid: sum(pcts) / len(pcts)
-                for uid, pcts in user_avg_percent.items()
-            }
-
-            sorted_users = sorted(user_avg_percent.items(), key=lambda x: x[1], reverse=True)
-            user_rank = next((i + 1 for i, (uid, _) in enumerate(sorted_users) if uid == user_id), None)
+            user_rank = get_user_rank(user_id)
 
             # Leaderboard Top 5
             leaderboard = []
             user_in_top_5 = False
 
-            for i, (uid, avg_score) in enumerate(sorted_users[:5]):
-                quiz_count = sum(1 for s in all_user_scores if s.user_id == uid)
-                name = User.query.get(uid).full_name
-                entry = {
-                    "rank": i + 1,
-                    "user": name,
-                    "average_score": round(avg_score, 2),
-                    "quizzes_attempted": quiz_count,
-                    "is_you": uid == user_id
-                }
-                if uid == user_id:
+            for entry in get_top_users(limit=5):
+                is_you = entry["user_id"] == user_id
+                if is_you:
                     user_in_top_5 = True
-                leaderboard.append(entry)
+                leaderboard.append({
+                    "rank": entry["rank"],
+                    "user": entry["full_name"],
+                    "average_score": entry["average_score"],
+                    "quizzes_attempted": entry["quizzes_attempted"],
+                    "is_you": is_you
+                })
 
             # Append user's own rank if not in top 5
             if not user_in_top_5 and user_rank:
-                avg_score = round(user_avg_percent[user_id], 2)
-                quiz_count = len([s for s in all_user_scores if s.user_id == user_id])
                 leaderboard.append({
                     "rank": user_rank,
                     "user": user.full_name,
-                    "average_score": avg_score,
-                    "quizzes_attempted": quiz_count,
+                    "average_score": round(stats.percentage_sum / stats.attempt_count, 2),
+                    "quizzes_attempted": stats.attempt_count,
                     "is_you": True
                 })
 
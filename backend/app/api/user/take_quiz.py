@@ -1,9 +1,17 @@
 from flask_restful import Resource, abort
-from flask import request
+from flask import request, Response, current_app
+import json
+import uuid
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from app.extensions import db
 from app.models import Quiz, Score
 from app.decorators import verified_and_active_user_required, get_current_user_or_abort
+from app.utils.stats_utils import record_attempt
+from app.utils.leaderboard_utils import sync_leaderboard
+from app.utils.cache_utils import invalidate_cache_for_user_scores
+from app.utils.quiz_cache_utils import get_quiz_payload, get_answer_key
+from app.utils.submission_utils import enqueue_submission, get_pending_score
 
 class QuizAvailabilityResource(Resource):
     method_decorators = [verified_and_active_user_required]
@@ -39,7 +47,7 @@ class QuizAvailabilityResource(Resource):
                 "Click 'Clear' to remove the selected answer for a question."
             ]
 
-            total_marks = len(quiz.questions)
+            total_marks = quiz.question_count
 
             return {
                 "status": "available",
@@ -70,31 +78,37 @@ class StartQuizResource(Resource):
         if now > quiz.due_date:
             abort(400, message="Quiz has expired")
 
-        questions_payload = [
-            {
-                "serial_number": idx + 1,
-                "id": q.id,
-                "question_statement": q.question_statement,
-                "options": [
-                    {"value": 1, "text": q.option1},
-                    {"value": 2, "text": q.option2},
-                    {"value": 3, "text": q.option3},
-                    {"value": 4, "text": q.option4}
-                ]
-            }
-            for idx, q in enumerate(quiz.questions)
-        ]
+        # The question payload is shared by every user, only start_time is per request
+        payload = get_quiz_payload(quiz)
+        start_time = json.dumps(now.strftime("%Y-%m-%d %H:%M:%S"))
 
-        return {
-            "status": "available",
-            "quiz_id": quiz.id,
-            "quiz_name": quiz.name,
-            "time_duration": str(quiz.time_duration),
-            "start_time": now.strftime("%Y-%m-%d %H:%M:%S"),
-            "questions": questions_payload
-        }, 200
+        return Response(
+            f'{{"start_time": {start_time}, {payload[1:]}',
+            status=200,
+            mimetype="application/json"
+        )
     
 
+def score_summary(total_questions, total_scored, time_taken, attempted=None):
+    """attempted is None for a stored Score, which doesn't keep the answers it was graded from."""
+    return {
+        "total_questions": total_questions,
+        "attempted": attempted,
+        "correct_answers": total_scored,
+        "wrong_answers": attempted - total_scored if attempted is not None else None,
+        "total_scored": total_scored,
+        "time_taken_seconds": time_taken
+    }
+
+
+def submission_response(submission_id, summary, status_code=200):
+    return {
+        "message": "Quiz submitted successfully",
+        "submission_id": submission_id,
+        "score_summary": summary
+    }, status_code
+
+
 class SubmitQuizResource(Resource):
     method_decorators = [verified_and_active_user_required]
 
@@ -112,6 +126,7 @@ class SubmitQuizResource(Resource):
 
         user_answers = data.get('answers')
         time_taken = data.get('time_taken')
+        submission_id = data.get('submission_id')
 
         if user_answers is None or not isinstance(user_answers, list):
             abort(400, message="'answers' field is required and must be a list")
@@ -119,46 +134,79 @@ class SubmitQuizResource(Resource):
         if time_taken is None or not isinstance(time_taken, (int, float)):
             abort(400, message="'time_taken' field is required and must be a number")
 
+        if submission_id is not None and (not isinstance(submission_id, str) or not 0 < len(submission_id) <= 64):
+            abort(400, message="'submission_id' must be a string of at most 64 characters")
+
+        if submission_id is not None:
+            # A retry gets the result stored for the first attempt, not one graded from the retry's answers
+            stored = Score.query.filter_by(user_id=user.id, submission_id=submission_id).first()
+            if stored:
+                return submission_response(submission_id, score_summary(
+                    quiz.question_count, stored.total_scored, stored.time_taken
+                ))
+
+        answer_key = get_answer_key(quiz.id)
+        total_questions = len(answer_key)
+        correct_count = sum(
+            1 for ans in user_answers
+            if ans.get('selected_option') in (1, 2, 3, 4)
+            and answer_key.get(ans.get('question_id')) == ans.get('selected_option')
+        )
 
-        question_map = {q.id: q for q in quiz.questions}
-        total_questions = len(question_map)
-        correct_count = 0
-
-        for ans in user_answers:
-            qid = ans.get('question_id')
-            selected_option = ans.get('selected_option')
-            if not qid or qid not in question_map:
-                continue
-
-            if selected_option not in [1, 2, 3, 4]:
-                continue
+        attempted_at = datetime.now()
 
-            if question_map[qid].correct_option == selected_option:
-                correct_count += 1
+        if current_app.config.get('SUBMISSION_WRITE_BEHIND'):
+            # Acknowledge once the result is on the stream, flush_quiz_submissions writes the Score
+            submission_id = submission_id or uuid.uuid4().hex
+            accepted = enqueue_submission({
+                "submission_id": submission_id,
+                "quiz_id": quiz.id,
+                "user_id": user.id,
+                "total_scored": correct_count,
+                "total_questions": total_questions,
+                "attempted": len(user_answers),
+                "time_taken": time_taken,
+                "attempted_at": attempted_at.isoformat()
+            })
+            if accepted is not None:
+                return submission_response(submission_id, score_summary(
+                    accepted["total_questions"], accepted["total_scored"], accepted["time_taken"],
+                    accepted.get("attempted")
+                ), 202)
+            return submission_response(submission_id, score_summary(
+                total_questions, correct_count, time_taken, len(user_answers)
+            ), 202)
 
         score_entry = Score(
             quiz_id=quiz.id,
             user_id=user.id,
             total_scored=correct_count,
             time_taken=time_taken,
-            time_stamp_of_attempt=datetime.now()
+            time_stamp_of_attempt=attempted_at,
+            submission_id=submission_id
         )
 
         db.session.add(score_entry)
-        db.session.commit()
+        record_attempt(user.id, quiz, correct_count, total_questions, time_taken, attempted_at)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            # A concurrent retry with the same submission_id won, report its result
+            stored = Score.query.filter_by(user_id=user.id, submission_id=submission_id).first()
+            if not stored:
+                raise
+            return submission_response(submission_id, score_summary(
+                quiz.question_count, stored.total_scored, stored.time_taken
+            ))
+
+        sync_leaderboard([user.id])
+        invalidate_cache_for_user_scores([user.id])
+        return submission_response(submission_id, score_summary(
+            total_questions, correct_count, time_taken, len(user_answers)
+        ))
+
 
-        return {
-            "message": "Quiz submitted successfully",
-            "score_summary": {
-                "total_questions": total_questions,
-                "attempted": len(user_answers),
-                "correct_answers": correct_count,
-                "wrong_answers": len(user_answers) - correct_count,
-                "total_scored": correct_count,
-                "time_taken_seconds": time_taken
-            }
-        }, 200
-    
 class QuizResultResource(Resource):
     method_decorators = [verified_and_active_user_required]
 
@@ -172,14 +220,23 @@ class QuizResultResource(Resource):
         score = Score.query.filter_by(user_id=user.id, quiz_id=quiz.id)\
                            .order_by(Score.time_stamp_of_attempt.desc()).first()
 
-        if not score:
+        if score:
+            scored, time_taken, attempted_at = score.total_scored, score.time_taken, score.time_stamp_of_attempt
+        else:
+            scored = time_taken = attempted_at = None
+
+        # Read through to a write-behind submission that hasn't been flushed yet
+        pending = get_pending_score(user.id, quiz.id)
+        if pending and (attempted_at is None or pending["attempted_at"] > attempted_at):
+            scored, time_taken, attempted_at = pending["total_scored"], pending["time_taken"], pending["attempted_at"]
+
+        if attempted_at is None:
             abort(404, message="No submission found for this quiz")
 
-        total_questions = len(quiz.questions)
-        scored = score.total_scored
+        total_questions = quiz.question_count
         percentage = (scored / total_questions) * 100 if total_questions > 0 else 0
 
-        time_taken_seconds = int(score.time_taken)
+        time_taken_seconds = int(time_taken)
         mins, secs = divmod(time_taken_seconds, 60)
         time_taken_str = f"{mins} mins {secs} secs" if mins else f"{secs} secs"
 
@@ -199,7 +256,7 @@ class QuizResultResource(Resource):
             "percentage": round(percentage, 2),
             "time_taken": time_taken_str,
             "message": message,
-            "attempted_on": score.time_stamp_of_attempt.strftime("%Y-%m-%d %H:%M:%S")
+            "attempted_on": attempted_at.strftime("%Y-%m-%d %H:%M:%S")
         }, 200
     
     
\ No newline at end of file
@@ -35,6 +35,15 @@ class Config:
     CACHE_REDIS_DB = 1  # Separate Redis DB for cache if preferred
     CACHE_DEFAULT_TIMEOUT = 300
 
+    # In-process LRU in front of Redis for cache_response(local=True) views, 0 bytes disables it.
+    # Kept coherent by pub/sub invalidations, CACHE_L1_TTL bounds staleness if one is missed.
+    CACHE_L1_MAX_BYTES = int(os.getenv('CACHE_L1_MAX_BYTES', 16 * 1024 * 1024))
+    CACHE_L1_MAX_ENTRIES = int(os.getenv('CACHE_L1_MAX_ENTRIES', 1024))
+    CACHE_L1_TTL = int(os.getenv('CACHE_L1_TTL', 30))  # Seconds
+
+    # Share of a client's remaining rate limit a worker may allow without asking Redis, 0 disables it
+    RATE_LIMIT_LOCAL_FRACTION = float(os.getenv('RATE_LIMIT_LOCAL_FRACTION', 0.1))
+
     # SMTP Config 
     MAIL_SERVER = os.getenv('MAIL_SERVER', 'localhost')
     MAIL_PORT = int(os.getenv('MAIL_PORT', 1025))
@@ -44,6 +53,37 @@ class Config:
     MAIL_USE_SSL = False
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'debug@example.com')
     
+    # Quiz submissions: acknowledge after a Redis stream append and insert scores in batches
+    SUBMISSION_WRITE_BEHIND = os.getenv('SUBMISSION_WRITE_BEHIND', 'false').lower() == 'true'
+    SUBMISSION_FLUSH_BATCH_SIZE = int(os.getenv('SUBMISSION_FLUSH_BATCH_SIZE', 500))
+
+    # CSV exports are written here and removed after EXPORT_RETENTION_HOURS
+    EXPORT_DIR = os.getenv('EXPORT_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'exports'))
+    EXPORT_RETENTION_HOURS = int(os.getenv('EXPORT_RETENTION_HOURS', 1))
+    ADMIN_EXPORT_SHARD_SIZE = int(os.getenv('ADMIN_EXPORT_SHARD_SIZE', 50000))  # Score ids per parallel shard
+
+    # Daily reminders are sent by send_reminder_batch subtasks of this many emails
+    REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', 100))
+
+    # Monthly reports are rendered and sent by send_report_batch subtasks of this many users
+    REPORT_BATCH_SIZE = int(os.getenv('REPORT_BATCH_SIZE', 20))
+
+    # PDF rendering. Set PDF_RENDER_QUEUE (e.g. 'pdf') to convert reports on the dedicated
+    # celery_pdf_worker.py pool instead of inline in the task that sends them
+    PDF_RENDER_QUEUE = os.getenv('PDF_RENDER_QUEUE') or None
+    PDF_WORKER_CONCURRENCY = int(os.getenv('PDF_WORKER_CONCURRENCY', 4))
+    PDF_RENDER_TIMEOUT = int(os.getenv('PDF_RENDER_TIMEOUT', 60))  # Seconds before a render is killed
+    if PDF_RENDER_TIMEOUT < 1:
+        raise ValueError(f"PDF_RENDER_TIMEOUT must be at least 1 second, got {PDF_RENDER_TIMEOUT}")
+    PDF_WORKER_MEMORY_LIMIT_MB = int(os.getenv('PDF_WORKER_MEMORY_LIMIT_MB', 1024))  # Address space cap per process
+    PDF_WORKER_MAX_RENDERS = int(os.getenv('PDF_WORKER_MAX_RENDERS', 50))  # Renders before a process is replaced
+
+    # Rendered monthly report PDFs, stored by a hash of the template and report context so
+    # retries, re-sends and user downloads reuse them. Point this at a mounted blob store in production.
+    REPORT_PDF_DIR = os.getenv('REPORT_PDF_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'report_pdfs'))
+    # PDFs no user's latest report points at are removed after this many days, long enough for a run's retries
+    REPORT_PDF_RETENTION_DAYS = int(os.getenv('REPORT_PDF_RETENTION_DAYS', 7))
+
     # Celery
     CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}')
     CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}')
@@ -66,4 +106,21 @@ class Config:
             'schedule': crontab(minute=0, hour=6, day_of_month='28-31'),  # End of each month
             'options': {'expires': 86400}  # expire task after 1 day
         },
+        'reconcile-dashboard-counters': {
+            'task': 'reconcile_dashboard_counters',
+            'schedule': crontab(minute=15),  # Every hour
+        },
+        'delete-expired-exports': {
+            'task': 'delete_expired_exports',
+            'schedule': crontab(minute=45),  # Every hour
+        },
+        'delete-expired-report-pdfs': {
+            'task': 'delete_expired_report_pdfs',
+            'schedule': crontab(minute=30, hour=4),  # Every day at 4:30 AM
+        },
+        'flush-quiz-submissions': {
+            'task': 'flush_quiz_submissions',
+            'schedule': timedelta(seconds=5),
+            'options': {'expires': 5}
+        },
     }
@@ -1,31 +1,78 @@
 from functools import wraps
-from flask import jsonify, g, abort
-from flask_jwt_extended import get_jwt_identity, jwt_required
-from app.models import User
+from flask import g
+from flask_restful import abort
+from flask_jwt_extended import get_jwt_identity, get_jwt, jwt_required
+from app.extensions import db
+from app.models import User, RoleEnum, UserStatusEnum
+from app.utils.cache_utils import get_cached_token_version, set_cached_token_version
+
+REVOKED_TOKEN_VERSION = -1  # Cached for deleted accounts
+
+def token_claims(user):
+    """Claims embedded in access tokens so decorators can authorize without a DB lookup."""
+    return {
+        "role": user.role.value,
+        "status": user.status.value,
+        "is_verified": bool(user.is_verified),
+        "token_version": user.token_version or 0,
+    }
+
+def current_token_version(user_id):
+    version = get_cached_token_version(user_id)
+    if version is None:
+        user = db.session.get(User, int(user_id))
+        version = (user.token_version or 0) if user else REVOKED_TOKEN_VERSION
+        set_cached_token_version(user_id, version)
+    return version
+
+def is_token_revoked(jwt_payload):
+    """Tokens issued before a status change or account deletion carry an outdated version."""
+    if "token_version" not in jwt_payload:
+        return False  # Legacy token, the decorators fall back to a DB check
+    return jwt_payload["token_version"] != current_token_version(jwt_payload["sub"])
+
+def revoke_user_tokens(user):
+    """Bump the user's token version. Call before committing the status change."""
+    user.token_version = (user.token_version or 0) + 1
+
+def sync_token_version(user_id, version=None):
+    """Refresh the cached version after the commit (None marks a deleted account)."""
+    set_cached_token_version(user_id, REVOKED_TOKEN_VERSION if version is None else version)
+
+def load_current_user():
+    """Fetch the JWT user once per request and keep it on flask.g."""
+    if 'current_user' not in g:
+        g.current_user = User.query.get(get_jwt_identity())
+    return g.current_user
 
 def admin_required(fn):
     @wraps(fn)
     @jwt_required()
     def wrapper(*args, **kwargs):
-        identity = get_jwt_identity()
-        user = User.query.get(identity)
+        claims = get_jwt()
+        if "role" in claims:
+            if claims["role"] != RoleEnum.ADMIN.value:
+                return {"msg": "Admin access required"}, 403
+            if claims["status"] != UserStatusEnum.ACTIVE.value:
+                return {"msg": "Account is suspended"}, 403
+            return fn(*args, **kwargs)
+
+        user = load_current_user()
 
         if not user:
-            return jsonify({"msg": "User not found"}), 404
+            return {"msg": "User not found"}, 404
 
         if not user.is_admin():
-            return jsonify({"msg": "Admin access required"}), 403
+            return {"msg": "Admin access required"}, 403
 
         if not user.is_active():
-            return jsonify({"msg": "Account is suspended"}), 403
-        
-        g.current_user = user
+            return {"msg": "Account is suspended"}, 403
+
         return fn(*args, **kwargs)
     return wrapper
 
 def get_current_user_or_abort(require_verified=False):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = load_current_user()
     if not user:
         abort(404, message="User not found")
     if not user.is_active():
@@ -38,6 +85,13 @@ def verified_and_active_user_required(fn):
     @wraps(fn)
     @jwt_required()
     def wrapper(*args, **kwargs):
-        get_current_user_or_abort(require_verified=True)
+        claims = get_jwt()
+        if "status" in claims:
+            if claims["status"] != UserStatusEnum.ACTIVE.value:
+                abort(403, message="Account is suspended")
+            if not claims["is_verified"]:
+                abort(403, message="Account not verified. Please verify your email.")
+        else:
+            get_current_user_or_abort(require_verified=True)
         return fn(*args, **kwargs)
     return wrapper
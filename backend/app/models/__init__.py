@@ -4,4 +4,7 @@ from .chapter import *
 from .quiz import *
 from .question import *
 from .score import *
-from .export_job import *
\ No newline at end of file
+from .export_job import *
+from .user_stats import *
+from .report_run import *
+from .monthly_report import *
\ No newline at end of file
@@ -2,6 +2,9 @@ from app.extensions import db
 
 class Chapter(db.Model):
     __tablename__ = 'chapter'
+    __table_args__ = (
+        db.Index('ix_chapter_subject_id', 'subject_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), nullable=False)
@@ -7,12 +7,34 @@ class ExportStatus(enum.Enum):
     completed = "completed"
     failed = "failed"
 
+class ExportKind(enum.Enum):
+    user_scores = "user_scores"  # A user's own scores
+    all_scores = "all_scores"  # Admin dump of every score, built from parallel shards
+
 class ExportJob(db.Model):
+    __table_args__ = (
+        db.Index('ix_export_job_user_id_created_at', 'user_id', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     filename = db.Column(db.String, nullable=True)
     status = db.Column(db.Enum(ExportStatus), default=ExportStatus.pending)
     created_at = db.Column(db.DateTime, default=datetime.now)
     completed_at = db.Column(db.DateTime, nullable=True)
+    kind = db.Column(db.Enum(ExportKind), nullable=False, default=ExportKind.user_scores, server_default='user_scores')
+    total_parts = db.Column(db.Integer, nullable=True)  # Shards planned, set once partitioning is done
+    completed_parts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    row_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def progress(self):
+        """Job state for status endpoints."""
+        return {
+            "status": self.status.value,
+            "total_parts": self.total_parts,
+            "completed_parts": self.completed_parts,
+            "row_count": self.row_count,
+            "percent": round(self.completed_parts / self.total_parts * 100, 2) if self.total_parts else 0
+        }
 
     user = db.relationship('User', backref='export_jobs')
@@ -0,0 +1,16 @@
+from app.extensions import db
+from datetime import datetime
+
+class MonthlyReport(db.Model):
+    """A user's latest monthly report PDF, stored under its content key in REPORT_PDF_DIR."""
+    __tablename__ = 'monthly_report'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    month = db.Column(db.String(7), nullable=False)  # YYYY-MM
+    pdf_key = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    user = db.relationship('User', backref=db.backref('monthly_report', uselist=False, cascade='all, delete-orphan'))
+
+    def __repr__(self):
+        return f'<MonthlyReport User {self.user_id} | {self.month}>'
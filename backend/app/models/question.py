@@ -2,6 +2,9 @@ from app.extensions import db
 
 class Question(db.Model):
     __tablename__ = 'question'
+    __table_args__ = (
+        db.Index('ix_question_quiz_id', 'quiz_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
@@ -3,6 +3,11 @@ from datetime import datetime
 
 class Quiz(db.Model):
     __tablename__ = 'quiz'
+    __table_args__ = (
+        db.Index('ix_quiz_chapter_id', 'chapter_id'),
+        db.Index('ix_quiz_due_date', 'due_date'),
+        db.Index('ix_quiz_date_of_quiz', 'date_of_quiz'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -11,6 +16,7 @@ class Quiz(db.Model):
     due_date = db.Column(db.DateTime, nullable=False)
     time_duration = db.Column(db.Time, nullable=False)
     remarks = db.Column(db.Text, nullable=True)
+    question_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Kept in sync by the question APIs
     date_created = db.Column(db.DateTime, default=datetime.now, nullable=False)
 
     chapter = db.relationship('Chapter', back_populates='quizzes')
@@ -0,0 +1,23 @@
+import enum
+from app.extensions import db
+from datetime import datetime
+
+class ReportRunStatus(enum.Enum):
+    running = "running"
+    completed = "completed"
+
+class ReportRun(db.Model):
+    """Progress and outcome of one send_monthly_report fan-out."""
+    __tablename__ = 'report_run'
+
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.String(7), nullable=False)  # YYYY-MM
+    status = db.Column(db.Enum(ReportRunStatus), nullable=False, default=ReportRunStatus.running)
+    total_users = db.Column(db.Integer, nullable=False, default=0)
+    sent_count = db.Column(db.Integer, nullable=False, default=0)
+    failed_count = db.Column(db.Integer, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<ReportRun {self.month}: {self.sent_count}/{self.total_users} sent, {self.failed_count} failed>'
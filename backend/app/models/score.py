@@ -3,6 +3,12 @@ from datetime import datetime
 
 class Score(db.Model):
     __tablename__ = 'score'
+    __table_args__ = (
+        db.Index('ix_score_user_id_time_stamp', 'user_id', 'time_stamp_of_attempt'),
+        db.Index('ix_score_quiz_id_user_id', 'quiz_id', 'user_id', 'time_stamp_of_attempt'),
+        db.Index('ix_score_time_stamp_of_attempt', 'time_stamp_of_attempt'),
+        db.UniqueConstraint('user_id', 'submission_id', name='uq_score_user_id_submission_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
@@ -10,6 +16,7 @@ class Score(db.Model):
     time_stamp_of_attempt = db.Column(db.DateTime, nullable=False, default=datetime.now)
     total_scored = db.Column(db.Integer, nullable=False)
     time_taken = db.Column(db.Float, nullable=False)
+    submission_id = db.Column(db.String(64), nullable=True)  # Client-supplied id, unique per user, makes retries idempotent
 
     user = db.relationship('User', back_populates='scores')
     quiz = db.relationship('Quiz', back_populates='scores')
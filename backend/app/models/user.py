@@ -14,6 +14,9 @@ class UserStatusEnum(str, Enum):
 
 class User(db.Model):
     __tablename__ = 'user'
+    __table_args__ = (
+        db.Index('ix_user_is_verified_status_role', 'is_verified', 'status', 'role'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     
@@ -32,6 +35,7 @@ class User(db.Model):
     notifications_enabled = db.Column(db.Boolean, default=True)
     preferred_reminder_time = db.Column(db.Time, default=time(hour=18, minute=0))  # Default 6 PM
     is_verified = db.Column(db.Boolean, default=False)  # Email verification
+    token_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Bumped to revoke issued JWTs
 
     scores = db.relationship('Score', back_populates='user', cascade='all, delete-orphan')
 
@@ -54,6 +58,9 @@ class User(db.Model):
 
 class ReminderLog(db.Model):
     __tablename__ = 'reminder_log'
+    __table_args__ = (
+        db.Index('ix_reminder_log_user_id_reminder_date', 'user_id', 'reminder_date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
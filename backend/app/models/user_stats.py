@@ -0,0 +1,40 @@
+from app.extensions import db
+
+class UserStatsAggregate(db.Model):
+    __tablename__ = 'user_stats_aggregate'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    attempt_count = db.Column(db.Integer, default=0, nullable=False)
+    percentage_sum = db.Column(db.Float, default=0.0, nullable=False)
+    total_time_taken = db.Column(db.Float, default=0.0, nullable=False)
+
+    # Performance buckets (high >= 80%, moderate >= 40%, low < 40%)
+    high_count = db.Column(db.Integer, default=0, nullable=False)
+    moderate_count = db.Column(db.Integer, default=0, nullable=False)
+    low_count = db.Column(db.Integer, default=0, nullable=False)
+
+    # Last attempt
+    last_quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id', ondelete='SET NULL'), nullable=True)
+    last_percentage = db.Column(db.Float, nullable=True)
+    last_attempt_at = db.Column(db.DateTime, nullable=True)
+
+    user = db.relationship('User', backref=db.backref('stats', uselist=False, cascade='all, delete-orphan'))
+    last_quiz = db.relationship('Quiz')
+
+    def __repr__(self):
+        return f'<UserStatsAggregate User {self.user_id} | Attempts {self.attempt_count}>'
+
+
+class UserSubjectStats(db.Model):
+    __tablename__ = 'user_subject_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subject.id'), primary_key=True)
+    attempt_count = db.Column(db.Integer, default=0, nullable=False)
+    percentage_sum = db.Column(db.Float, default=0.0, nullable=False)
+
+    user = db.relationship('User', backref=db.backref('subject_stats', cascade='all, delete-orphan'))
+    subject = db.relationship('Subject', backref=db.backref('user_stats', cascade='all, delete-orphan'))
+
+    def __repr__(self):
+        return f'<UserSubjectStats User {self.user_id} | Subject {self.subject_id}>'
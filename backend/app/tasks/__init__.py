@@ -2,4 +2,7 @@ from .cleanup_tasks import *
 from.email_tasks import *
 from .export_tasks import *
 from .reminder_tasks import *
-from .report_tasks import *
\ No newline at end of file
+from .report_tasks import *
+from .counter_tasks import *
+from .submission_tasks import *
+from .pdf_tasks import *
\ No newline at end of file
@@ -1,7 +1,11 @@
 from datetime import datetime, timedelta
 
 from app.extensions import db
-from app.models import User
+from app.models import User, ExportJob, ExportStatus, MonthlyReport
+from flask import current_app
+from app.utils.counter_utils import user_counter_snapshot, adjust_counters
+from app.utils.export_utils import remove_expired_exports, remove_orphaned_shards
+from app.utils.report_utils import remove_expired_report_pdfs
 
 def register_cleanup_tasks(celery):
     @celery.task(name='delete_unverified_users_older_than')
@@ -12,9 +16,26 @@ def register_cleanup_tasks(celery):
             User.created_at < expiry_time
         ).all()
 
+        counter_deltas = {}
         for user in old_users:
+            for field, value in user_counter_snapshot(user).items():
+                counter_deltas[field] = counter_deltas.get(field, 0) - value
             db.session.delete(user)
         db.session.commit()
+        adjust_counters(**counter_deltas)
+
+    @celery.task(name='delete_expired_exports')
+    def delete_expired_exports():
+        retention_hours = current_app.config.get('EXPORT_RETENTION_HOURS', 1)
+        running = {job_id for job_id, in db.session.query(ExportJob.id).filter(ExportJob.status == ExportStatus.pending)}
+        return remove_expired_exports(retention_hours * 3600) + remove_orphaned_shards(running)
+
+    @celery.task(name='delete_expired_report_pdfs')
+    def delete_expired_report_pdfs():
+        """Report PDFs are kept while some user's latest report points at them."""
+        retention_days = current_app.config.get('REPORT_PDF_RETENTION_DAYS', 7)
+        latest = {pdf_key for pdf_key, in db.session.query(MonthlyReport.pdf_key)}
+        return remove_expired_report_pdfs(retention_days * 86400, latest)
 
     return delete_unverified_users_older_than
 
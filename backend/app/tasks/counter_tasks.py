@@ -0,0 +1,9 @@
+from app.utils.counter_utils import reconcile_counters
+
+def register_counter_tasks(celery):
+    @celery.task(name='reconcile_dashboard_counters')
+    def reconcile_dashboard_counters():
+        """Recount the admin dashboard counters from the database to correct any drift."""
+        return reconcile_counters()
+
+    return reconcile_dashboard_counters
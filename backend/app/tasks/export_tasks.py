@@ -1,11 +1,21 @@
-import csv
-from io import StringIO
+import os
+from celery import chord
 from flask import current_app
+from sqlalchemy import func
 from app.extensions import  db
-from app.models import Score, User, ExportJob, Quiz, Chapter, ExportStatus
-from sqlalchemy.orm import joinedload
+from app.models import Score, User, ExportJob, Quiz, Chapter, Subject, ExportStatus
+from app.utils.export_utils import (
+    write_csv_gz, merge_csv_gz, shard_dir, shard_filename, remove_export_shards
+)
 from datetime import datetime
 
+EXPORT_BATCH_SIZE = 1000
+
+ALL_SCORES_HEADER = [
+    "score_id", "user_id", "username", "quiz_id", "quiz_name", "chapter_name", "subject_name",
+    "attempted_at", "total_scored", "total_questions", "score_percentage", "time_taken"
+]
+
 def register_export_tasks(celery):
     @celery.task(name="export_user_scores_csv")
     def export_user_scores_csv(user_id, job_id):
@@ -17,50 +27,50 @@ def register_export_tasks(celery):
                 db.session.commit()
                 return {"error": "User not found"}
 
-            scores = (
-                Score.query
-                .filter_by(user_id=user.id)
-                .options(
-                    joinedload(Score.quiz).joinedload(Quiz.chapter).joinedload(Chapter.subject),
-                    joinedload(Score.quiz).joinedload(Quiz.questions)
+            # Plain columns streamed in batches (a server-side cursor where the driver supports one)
+            rows = (
+                db.session.query(
+                    Quiz.id,
+                    Quiz.name,
+                    Chapter.id,
+                    Chapter.name,
+                    Subject.name,
+                    Score.time_stamp_of_attempt,
+                    Score.total_scored,
+                    Quiz.question_count
                 )
+                .join(Quiz, Score.quiz_id == Quiz.id)
+                .join(Chapter, Quiz.chapter_id == Chapter.id)
+                .join(Subject, Chapter.subject_id == Subject.id)
+                .filter(Score.user_id == user.id)
                 .order_by(Score.time_stamp_of_attempt.desc())
-                .all()
+                .yield_per(EXPORT_BATCH_SIZE)
             )
 
-            output = StringIO()
-            writer = csv.writer(output)
-            writer.writerow([
+            def csv_rows():
+                for quiz_id, quiz_name, chapter_id, chapter_name, subject_name, attempted_at, total_scored, total_q in rows:
+                    percentage = (total_scored / total_q * 100) if total_q else 0
+                    remarks = "Good attempt" if percentage >= 75 else "Needs improvement"
+                    yield [
+                        quiz_id,
+                        quiz_name,
+                        chapter_id,
+                        chapter_name,
+                        subject_name,
+                        attempted_at.strftime("%Y-%m-%d"),
+                        total_scored,
+                        total_q,
+                        round(percentage, 2),
+                        remarks
+                    ]
+
+            filename = f"user_export_{job_id}.csv.gz"
+            write_csv_gz(filename, [
                 "quiz_id", "quiz_name", "chapter_id", "chapter_name", "subject_name",
                 "date_of_quiz", "total_scored", "total_questions", "score_percentage", "remarks"
-            ])
-
-            for score in scores:
-                quiz = score.quiz
-                chapter = quiz.chapter
-                subject = chapter.subject
-                total_q = len(quiz.questions)
-                percentage = (score.total_scored / total_q * 100) if total_q else 0
-                remarks = "Good attempt" if percentage >= 75 else "Needs improvement"
-                writer.writerow([
-                    quiz.id,
-                    quiz.name,
-                    chapter.id,
-                    chapter.name,
-                    subject.name,
-                    score.time_stamp_of_attempt.strftime("%Y-%m-%d"),
-                    score.total_scored,
-                    total_q,
-                    round(percentage, 2),
-                    remarks
-                ])
-
-            csv_content = output.getvalue()
+            ], csv_rows())
 
-            redis_key = f"user_export:{job_id}"
-            current_app.redis_client.set(redis_key, csv_content, ex=3600)  # expires in 1 hour
-
-            job.filename = None
+            job.filename = filename
             job.status = ExportStatus.completed
             job.completed_at = datetime.now()
             db.session.commit()
@@ -75,4 +85,122 @@ def register_export_tasks(celery):
             current_app.logger.error(f"Export failed: {e}")
             return {"error": str(e)}
         
-    return export_user_scores_csv
\ No newline at end of file
+    @celery.task(name="export_all_scores_csv")
+    def export_all_scores_csv(job_id):
+        """Split the Score table into id ranges and export them in parallel with a chord."""
+        try:
+            job = db.session.get(ExportJob, job_id)
+            first_id, last_id = db.session.query(func.min(Score.id), func.max(Score.id)).one()
+            shard_size = current_app.config.get('ADMIN_EXPORT_SHARD_SIZE', 50000)
+            ranges = [
+                (start, min(start + shard_size - 1, last_id))
+                for start in range(first_id, last_id + 1, shard_size)
+            ] if first_id is not None else []
+
+            job.total_parts = len(ranges)
+            db.session.commit()
+
+            if not ranges:
+                return merge_score_shards([], job_id)
+
+            chord(
+                export_score_shard.s(job_id, part, start, end)
+                for part, (start, end) in enumerate(ranges)
+            )(merge_score_shards.s(job_id).on_error(mark_export_failed.s(job_id)))
+
+            return {"status": "started", "parts": len(ranges)}
+
+        except Exception as e:
+            db.session.rollback()
+            mark_export_failed(None, e, None, job_id)
+            current_app.logger.error(f"Export failed: {e}")
+            return {"error": str(e)}
+
+    @celery.task(name="export_score_shard")
+    def export_score_shard(job_id, part, first_id, last_id):
+        """Write scores with first_id <= id <= last_id to a headerless gzip shard."""
+        rows = (
+            db.session.query(
+                Score.id,
+                User.id,
+                User.username,
+                Quiz.id,
+                Quiz.name,
+                Chapter.name,
+                Subject.name,
+                Score.time_stamp_of_attempt,
+                Score.total_scored,
+                Quiz.question_count,
+                Score.time_taken
+            )
+            .join(User, Score.user_id == User.id)
+            .join(Quiz, Score.quiz_id == Quiz.id)
+            .join(Chapter, Quiz.chapter_id == Chapter.id)
+            .join(Subject, Chapter.subject_id == Subject.id)
+            .filter(Score.id.between(first_id, last_id))
+            .order_by(Score.id)
+            .yield_per(EXPORT_BATCH_SIZE)
+        )
+
+        def csv_rows():
+            for score_id, user_id, username, quiz_id, quiz_name, chapter_name, subject_name, \
+                    attempted_at, total_scored, total_q, time_taken in rows:
+                percentage = (total_scored / total_q * 100) if total_q else 0
+                yield [
+                    score_id,
+                    user_id,
+                    username,
+                    quiz_id,
+                    quiz_name,
+                    chapter_name,
+                    subject_name,
+                    attempted_at.strftime("%Y-%m-%d %H:%M:%S"),
+                    total_scored,
+                    total_q,
+                    round(percentage, 2),
+                    round(time_taken, 2)
+                ]
+
+        filename = shard_filename(part)
+        count = write_csv_gz(filename, None, csv_rows(), directory=shard_dir(job_id))
+
+        # Shards finish concurrently, so bump the progress counters in SQL
+        ExportJob.query.filter_by(id=job_id).update({
+            ExportJob.completed_parts: ExportJob.completed_parts + 1,
+            ExportJob.row_count: ExportJob.row_count + count,
+        }, synchronize_session=False)
+        db.session.commit()
+
+        return filename
+
+    @celery.task(name="merge_score_shards")
+    def merge_score_shards(part_filenames, job_id):
+        """Chord callback: join the shards (in id order) into the final export."""
+        job = db.session.get(ExportJob, job_id)
+        filename = f"all_scores_{job_id}.csv.gz"
+        parts = shard_dir(job_id)
+        merge_csv_gz(filename, ALL_SCORES_HEADER, [os.path.join(parts, part) for part in part_filenames])
+        remove_export_shards(job_id)
+
+        job.filename = filename
+        job.status = ExportStatus.completed
+        job.completed_at = datetime.now()
+        db.session.commit()
+
+        return {"status": "completed", "rows": job.row_count}
+
+    @celery.task(name="mark_export_failed")
+    def mark_export_failed(request, exc, traceback, job_id):
+        """
+        Error callback for the export chord, called as errback(request, exc, traceback)
+        with job_id bound after them. Shards that were already written are removed.
+        """
+        job = db.session.get(ExportJob, job_id)
+        if job:
+            job.status = ExportStatus.failed
+            db.session.commit()
+        remove_export_shards(job_id)
+        failed_task_id = request.id if request is not None else None
+        return {"error": f"Export task {failed_task_id} failed: {exc}"}
+
+    return export_user_scores_csv
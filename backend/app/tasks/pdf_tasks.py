@@ -0,0 +1,13 @@
+import base64
+from app.utils.pdf_utils import html_to_pdf
+
+def register_pdf_tasks(celery):
+    @celery.task(name='render_pdf')
+    def render_pdf(html):
+        """
+        Convert rendered HTML to PDF on the dedicated PDF worker (celery_pdf_worker.py).
+        Returns base64 text since the result travels through the JSON serializer.
+        """
+        return base64.b64encode(html_to_pdf(html)).decode('ascii')
+
+    return render_pdf
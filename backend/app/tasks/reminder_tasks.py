@@ -1,62 +1,123 @@
 from datetime import datetime, timedelta, time, date
 from flask import current_app
+from sqlalchemy import func, insert
+from sqlalchemy.orm import aliased
 from app.extensions import db
-from app.models import User, Quiz, ReminderLog
-from app.utils.email_utils import send_email
+from app.models import User, Quiz, Score, ReminderLog, RoleEnum, UserStatusEnum
+from app.utils.email_utils import send_many
 
 DEFAULT_REMINDER_TIME = time(hour=18, minute=0)  # 6 PM
 
+def due_reminder_users(now, today, force_send=False):
+    """Users who want a reminder now and haven't had one today (everyone eligible when forced)."""
+    query = db.session.query(User.id, User.username, User.full_name, User.last_login).filter(
+        User.is_verified == True,
+        User.status == UserStatusEnum.ACTIVE,
+        User.role != RoleEnum.ADMIN,
+        User.notifications_enabled == True
+    )
+    if not force_send:
+        sent_today = (
+            db.session.query(ReminderLog.id)
+            .filter(ReminderLog.user_id == User.id, ReminderLog.reminder_date == today)
+            .exists()
+        )
+        query = query.filter(
+            func.coalesce(User.preferred_reminder_time, DEFAULT_REMINDER_TIME) <= now.time(),
+            ~sent_today
+        )
+    return query
+
+def newest_unattempted_quizzes(users_query):
+    """
+    {user_id: (quiz_name, due_date)} of the latest quiz each user hasn't attempted, in one query.
+    A correlated LIMIT 1 per user walks the quizzes newest first and stops at the first unattempted
+    one, instead of building every user and quiz pair.
+    """
+    user_ids = users_query.with_entities(User.id.label('user_id')).subquery()
+    candidate = aliased(Quiz)
+    attempted = (
+        db.session.query(Score.id)
+        .filter(Score.user_id == user_ids.c.user_id, Score.quiz_id == candidate.id)
+        .correlate(user_ids, candidate)
+        .exists()
+    )
+    newest_quiz_id = (
+        db.session.query(candidate.id)
+        .filter(~attempted)
+        .order_by(candidate.date_of_quiz.desc(), candidate.id.desc())
+        .limit(1)
+        .correlate(user_ids)
+        .scalar_subquery()
+    )
+    rows = (
+        db.session.query(user_ids.c.user_id, Quiz.name, Quiz.due_date)
+        .select_from(user_ids)
+        .join(Quiz, Quiz.id == newest_quiz_id)
+    )
+    return {user_id: (name, due_date) for user_id, name, due_date in rows}
+
 def register_reminder_tasks(celery):
     @celery.task(name="send_daily_reminders")
     def send_daily_reminders(force_send=False):
+        """Pick who gets a reminder with set-based queries, log them in bulk and fan the sends out."""
         now = datetime.now()
         today = date.today()
 
         base_url = current_app.config.get('BASE_URL', 'http://localhost:8080')
+        batch_size = current_app.config.get('REMINDER_BATCH_SIZE', 100)
+        threshold = now - timedelta(days=1)
 
-        users = User.query.filter_by(is_verified=True, status='active').all()
-
-        for user in users:
-            if user.is_admin():
-                continue
-
-            if not user.notifications_enabled:
-                continue
-
-            preferred_time = user.preferred_reminder_time or DEFAULT_REMINDER_TIME
+        users_query = due_reminder_users(now, today, force_send)
+        users = users_query.all()
+        if not users:
+            return {"queued": 0}
+        newest_quizzes = newest_unattempted_quizzes(users_query)
 
-            if not force_send and now.time() < preferred_time:
-                continue
+        reminders = []
+        for user_id, username, full_name, last_login in users:
+            quiz = newest_quizzes.get(user_id)
+            recent_login = last_login and last_login > threshold
 
-            sent_today = ReminderLog.query.filter_by(user_id=user.id, reminder_date=today).first()
-            if sent_today and not force_send:
+            if recent_login and not quiz:
                 continue
 
-            threshold = now - timedelta(days=1)
-            recent_login = user.last_login and user.last_login > threshold
-
-            attempted_quiz_ids = {score.quiz_id for score in user.scores}
-            new_quizzes = Quiz.query.filter(~Quiz.id.in_(attempted_quiz_ids)).order_by(Quiz.date_of_quiz.desc()).all()
-
-            if not recent_login or new_quizzes:
-                quiz = new_quizzes[0] if new_quizzes else None
-
-                context = {
-                    "username": user.full_name,
-                    "quiz_title": quiz.name if quiz else "your pending quizzes",
-                    "due_date": quiz.due_date.strftime("%B %d, %Y") if quiz else "soon",
+            reminders.append({
+                "user_id": user_id,
+                "to": username,
+                "context": {
+                    "username": full_name,
+                    "quiz_title": quiz[0] if quiz else "your pending quizzes",
+                    "due_date": quiz[1].strftime("%B %d, %Y") if quiz else "soon",
                     "quiz_url": f"{base_url}/user/quizzes"
                 }
-
-                send_email(
-                    to=user.username,
-                    subject="Reminder: Don't miss your next quiz!",
-                    template_name="daily_reminder.html",
-                    context=context
-                )
-
-                reminder_log = ReminderLog(user_id=user.id, reminder_date=today)
-                db.session.add(reminder_log)
-                db.session.commit()
+            })
+
+        if not reminders:
+            return {"queued": 0}
+
+        # Logged before sending so the next run doesn't pick these users up again
+        db.session.execute(insert(ReminderLog), [
+            {"user_id": reminder["user_id"], "reminder_date": today, "sent_at": now}
+            for reminder in reminders
+        ])
+        db.session.commit()
+
+        for start in range(0, len(reminders), batch_size):
+            send_reminder_batch.delay(reminders[start:start + batch_size])
+
+        return {"queued": len(reminders)}
+
+    @celery.task(name="send_reminder_batch")
+    def send_reminder_batch(reminders):
+        return send_many(
+            {
+                "to": reminder["to"],
+                "subject": "Reminder: Don't miss your next quiz!",
+                "template_name": "daily_reminder.html",
+                "context": reminder["context"]
+            }
+            for reminder in reminders
+        )
 
     return send_daily_reminders
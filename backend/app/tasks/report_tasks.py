@@ -1,13 +1,136 @@
 from calendar import monthrange
+from celery import chord
 from datetime import datetime
-from app.models import User, Quiz, Score
-from app.utils.pdf_utils import generate_pdf_from_template
-from app.utils.email_utils import send_email
+from flask import current_app
+from app.models import User, Quiz, Score, ReportRun, ReportRunStatus, MonthlyReport, RoleEnum, UserStatusEnum
+from app.utils.report_utils import (
+    render_monthly_report, render_monthly_reports, report_pdf_key, monthly_report_html, missing_report_pdfs
+)
+from app.utils.pdf_utils import pdf_render_queue, render_pdf_signature, decode_pdf, forget_results
+from app.utils.email_utils import build_message, get_mailer
 from app.extensions import db
 import logging
 
 logger = logging.getLogger(__name__)
 
+REPORT_MAX_RETRIES = 3
+REPORT_RETRY_DELAY = 300  # Seconds between retries of a single user's report
+
+def monthly_report_contexts(month_start, month_end, month_label):
+    """Report context for every eligible user, from one query over the month's scores."""
+    month_scores = (
+        db.session.query(
+            Score.user_id,
+            Score.total_scored,
+            Score.time_stamp_of_attempt,
+            Quiz.name,
+            Quiz.question_count
+        )
+        .join(Quiz, Score.quiz_id == Quiz.id)
+        .filter(
+            Score.time_stamp_of_attempt >= month_start,
+            Score.time_stamp_of_attempt <= month_end
+        )
+        .subquery()
+    )
+    rows = (
+        db.session.query(
+            User.id,
+            User.username,
+            User.full_name,
+            month_scores.c.name,
+            month_scores.c.question_count,
+            month_scores.c.total_scored,
+            month_scores.c.time_stamp_of_attempt
+        )
+        .outerjoin(month_scores, month_scores.c.user_id == User.id)
+        .filter(
+            User.is_verified == True,
+            User.status == UserStatusEnum.ACTIVE,
+            User.role == RoleEnum.USER
+        )
+        .order_by(User.id, month_scores.c.time_stamp_of_attempt)
+    )
+
+    reports = {}
+    for user_id, username, full_name, quiz_name, question_count, total_scored, attempted_at in rows:
+        report = reports.get(user_id)
+        if report is None:
+            report = reports[user_id] = {
+                "user_id": user_id,
+                "to": username,
+                "context": {"username": full_name, "month": month_label, "quizzes": []}
+            }
+
+        if quiz_name is None:
+            continue  # No attempts this month
+
+        if question_count == 0:
+            logger.warning(f"Quiz '{quiz_name}' has no questions. Skipping.")
+            continue
+
+        report["context"]["quizzes"].append({
+            "name": quiz_name,
+            "date": attempted_at.strftime("%Y-%m-%d"),
+            "score": round((total_scored / question_count) * 100, 2),
+        })
+
+    for report in reports.values():
+        context = report["context"]
+        total_quizzes = len(context["quizzes"])
+        context["total_quizzes"] = total_quizzes
+        context["average_score"] = round(
+            sum(quiz["score"] for quiz in context["quizzes"]) / total_quizzes, 2
+        ) if total_quizzes > 0 else 0
+
+    return list(reports.values())
+
+def send_report(report, html, pdf_bytes):
+    """Send one user's rendered report. Raises if the email can't be sent."""
+    context = report["context"]
+    get_mailer().send(build_message(
+        to=report["to"],
+        subject=f"Your Monthly Quiz Report - {context['month']}",
+        html=html,
+        attachments=[("monthly_report.pdf", pdf_bytes, "application/pdf")] if pdf_bytes else None
+    ))
+
+def record_monthly_reports(run_id, reports):
+    """Make these reports each user's latest, for download without a re-render."""
+    if not reports:
+        return
+    month = db.session.query(ReportRun.month).filter_by(id=run_id).scalar()
+    existing = {
+        row.user_id: row
+        for row in MonthlyReport.query.filter(MonthlyReport.user_id.in_([report["user_id"] for report in reports]))
+    }
+    now = datetime.now()
+    for report in reports:
+        row = existing.get(report["user_id"])
+        if row is None:
+            row = MonthlyReport(user_id=report["user_id"])
+            db.session.add(row)
+        row.month = month
+        row.pdf_key = report_pdf_key(report["context"])
+        row.created_at = now
+    db.session.commit()
+
+def record_report_progress(run_id, sent=0, failed=0):
+    """Add to the run's counters and close it once every user is accounted for."""
+    ReportRun.query.filter_by(id=run_id).update({
+        ReportRun.sent_count: ReportRun.sent_count + sent,
+        ReportRun.failed_count: ReportRun.failed_count + failed,
+    }, synchronize_session=False)
+    ReportRun.query.filter(
+        ReportRun.id == run_id,
+        ReportRun.status == ReportRunStatus.running,
+        ReportRun.sent_count + ReportRun.failed_count >= ReportRun.total_users
+    ).update({
+        ReportRun.status: ReportRunStatus.completed,
+        ReportRun.completed_at: datetime.now(),
+    }, synchronize_session=False)
+    db.session.commit()
+
 def register_report_tasks(celery):
     @celery.task(name="send_monthly_report")
     def send_monthly_report(force=False):
@@ -24,63 +147,85 @@ def register_report_tasks(celery):
         month_start = datetime(now.year, now.month, 1)
         month_end = datetime(now.year, now.month, last_day, 23, 59, 59)
 
-        users = User.query.filter_by(is_verified=True, status='active', role ='user').all()
-        logger.info(f"Found {len(users)} users")
-
-        for user in users:
-            
-            scores = (
-                db.session.query(Quiz, Score)
-                .join(Score, (Score.quiz_id == Quiz.id))
-                .filter(
-                    Score.user_id == user.id,
-                    Score.time_stamp_of_attempt >= month_start,
-                    Score.time_stamp_of_attempt <= month_end
-                )
-                .all()
-            )
-
-            quizzes_list = []
-            total_percentage = 0
-            for quiz, score_obj in scores:
-                question_count = len(quiz.questions)
-                
-                if question_count == 0:
-                    logger.warning(f"Quiz '{quiz.name}' has no questions. Skipping.")
-                    continue
-                
-                percentage = round((score_obj.total_scored / question_count) * 100, 2)
-                quizzes_list.append({
-                    "name": quiz.name,
-                    "date": score_obj.time_stamp_of_attempt.strftime("%Y-%m-%d"),
-                    "score": percentage,  
-                })
-                total_percentage += percentage
-
-            total_quizzes = len(quizzes_list)
-            average_score = round(total_percentage / total_quizzes, 2) if total_quizzes > 0 else 0
-
-            context = {
-                "username": user.full_name,
-                "month": now.strftime("%B %Y"),
-                "quizzes": quizzes_list,
-                "total_quizzes": total_quizzes,
-                "average_score": average_score,
-            }
-            attachments = []
-            try:
-                pdf_bytes = generate_pdf_from_template("monthly_report.html", context)
-                attachments.append(("monthly_report.pdf", pdf_bytes, "application/pdf"))
+        reports = monthly_report_contexts(month_start, month_end, now.strftime("%B %Y"))
+        logger.info(f"Found {len(reports)} users")
+
+        run = ReportRun(month=now.strftime("%Y-%m"), total_users=len(reports))
+        if not reports:
+            run.status = ReportRunStatus.completed
+            run.completed_at = now
+        db.session.add(run)
+        db.session.commit()
 
+        batch_size = current_app.config.get('REPORT_BATCH_SIZE', 20)
+        for start in range(0, len(reports), batch_size):
+            send_report_batch.delay(run.id, reports[start:start + batch_size])
+
+        return {"run_id": run.id, "users": len(reports)}
+
+    def deliver_report_batch(run_id, reports, converted=None):
+        """Send a chunk of reports. Failures are retried one user at a time."""
+        sent = 0
+        rendered = render_monthly_reports([report["context"] for report in reports], converted)
+        record_monthly_reports(run_id, [report for report, (_, pdf_bytes) in zip(reports, rendered) if pdf_bytes])
+        for report, (html, pdf_bytes) in zip(reports, rendered):
+            try:
+                send_report(report, html, pdf_bytes)
+                sent += 1
             except Exception as e:
-                logger.error(f"Failed to generate PDF for user {user.username}: {e}")
-            
-            send_email(
-                to=user.username,
-                subject=f"Your Monthly Quiz Report - {context['month']}",
-                template_name="monthly_report.html",
-                context=context,
-                attachments=attachments if attachments else None
-            )
-
-    return send_monthly_report
\ No newline at end of file
+                logger.error(f"Failed to send monthly report to {report['to']}: {e}. Retrying.")
+                send_user_report.apply_async(args=[run_id, report], countdown=REPORT_RETRY_DELAY)
+        record_report_progress(run_id, sent=sent)
+        return sent
+
+    @celery.task(name="send_report_batch")
+    def send_report_batch(run_id, reports):
+        """
+        Render and send a chunk of reports. With the PDF worker pool, PDFs not stored yet are
+        converted in a chord and the send runs as its callback, so no worker waits on the pool.
+        """
+        contexts = [report["context"] for report in reports]
+        missing = missing_report_pdfs(contexts) if pdf_render_queue() else []
+        if not missing:
+            return deliver_report_batch(run_id, reports)
+
+        header = [render_pdf_signature(monthly_report_html(contexts[i])) for i in missing]
+        result_ids = [signature.freeze().id for signature in header]
+        chord(header)(
+            send_rendered_report_batch.s(run_id, reports, missing, result_ids)
+            .on_error(report_batch_render_failed.s(run_id, reports, result_ids))
+        )
+        return {"converting": len(missing)}
+
+    @celery.task(name="send_rendered_report_batch")
+    def send_rendered_report_batch(results, run_id, reports, missing, result_ids):
+        """Chord callback: store the converted PDFs and send the batch."""
+        forget_results(result_ids)
+        return deliver_report_batch(run_id, reports, {i: decode_pdf(result) for i, result in zip(missing, results)})
+
+    @celery.task(name="report_batch_render_failed")
+    def report_batch_render_failed(request, exc, traceback, run_id, reports, result_ids):
+        """
+        Chord errback, run by the PDF worker whose render failed. Hands the batch back to the
+        default queue to be sent without the PDFs that weren't stored already.
+        """
+        logger.error(f"PDF conversion failed for a report batch: {exc}")
+        send_rendered_report_batch.delay([], run_id, reports, [], result_ids)
+
+    @celery.task(name="send_user_report", bind=True, max_retries=REPORT_MAX_RETRIES, default_retry_delay=REPORT_RETRY_DELAY)
+    def send_user_report(self, run_id, report):
+        try:
+            html, pdf_bytes = render_monthly_report(report["context"])
+            if pdf_bytes:
+                record_monthly_reports(run_id, [report])
+            send_report(report, html, pdf_bytes)
+        except Exception as e:
+            if self.request.retries < self.max_retries:
+                raise self.retry(exc=e)
+            logger.error(f"Giving up on monthly report for {report['to']}: {e}")
+            record_report_progress(run_id, failed=1)
+            return False
+        record_report_progress(run_id, sent=1)
+        return True
+
+    return send_monthly_report
@@ -0,0 +1,10 @@
+from flask import current_app
+from app.utils.submission_utils import flush_submissions
+
+def register_submission_tasks(celery):
+    @celery.task(name='flush_quiz_submissions')
+    def flush_quiz_submissions():
+        """Bulk-insert scores accepted in write-behind mode. A no-op when the stream is empty."""
+        return flush_submissions(batch_size=current_app.config.get('SUBMISSION_FLUSH_BATCH_SIZE', 500))
+
+    return flush_quiz_submissions
@@ -1,7 +1,14 @@
 from flask import current_app, request, make_response
+from flask_jwt_extended import get_jwt_identity
 from functools import wraps
-import json
-from app.decorators import get_current_user_or_abort
+import hashlib
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from app.utils.local_cache import INVALIDATION_CHANNEL, get_local_cache, existing_local_cache
 
 def get_redis():
     redis = getattr(current_app, 'redis_client', None)
@@ -13,6 +20,7 @@ def get_redis():
 OTP_EXPIRY = 300  
 RESEND_OTP_COOLDOWN = 60  
 TEMP_PASSWORD_EXPIRY = 300  
+TOKEN_VERSION_EXPIRY = 7 * 24 * 3600  # Same as JWT_ACCESS_TOKEN_EXPIRES
 
 # OTP Functions
 def set_otp(user_id, otp, expiry=OTP_EXPIRY):
@@ -54,94 +62,373 @@ def set_resend_otp_lock(user_id, cooldown=RESEND_OTP_COOLDOWN):
     get_redis().setex(key, cooldown, "locked")
 
 
+# Token Version Functions
+def get_cached_token_version(user_id):
+    key = f"token_version:{user_id}"
+    version = get_redis().get(key)
+    return int(version) if version is not None else None
+
+def set_cached_token_version(user_id, version, expiry=TOKEN_VERSION_EXPIRY):
+    key = f"token_version:{user_id}"
+    get_redis().setex(key, expiry, version)
+
+
 # --- Caching & Rate Limiting ---
 
-def cache_response(ttl=60, user_scope=False):
+# Cached responses are stamped with the generation of every tag they depend on. Invalidating a tag
+# is a single INCR, entries with an older generation are treated as misses and expire on their TTL.
+TAG_GENERATION_EXPIRY = 24 * 3600  # Must outlive the longest cache_response ttl
+
+CACHE_STALE_SECONDS = 60  # Expired entries are kept this long, served while one request rebuilds them
+CACHE_LOCK_SECONDS = 10  # Longest a rebuild holds its lock
+CACHE_LOCK_WAIT_SECONDS = 2  # Longest a request waits for another one's rebuild before doing it itself
+CACHE_LOCK_POLL_SECONDS = 0.05
+CACHE_TTL_JITTER = 0.1  # Up to 10% off each entry's fresh lifetime
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+def tag_generation_key(tag):
+    return f"cache_tag:{tag}"
+
+def cache_tags_for(tags, user_scope=False, **view_args):
+    """Resolve a view's tags, e.g. "questions:{quiz_id}" with the URL's quiz_id. User scoped views get "user:<id>"."""
+    resolved = [tag.format(**view_args) for tag in tags]
+    if user_scope:
+        resolved.append(f"user:{get_jwt_identity()}")
+    return resolved
+
+def invalidate_cache_tags(*tags):
+    """Make every cached response depending on one of these tags stale, O(number of tags)."""
+    redis = get_redis()
+    pipe = redis.pipeline(transaction=False)
+    for tag in tags:
+        pipe.incr(tag_generation_key(tag))
+        pipe.expire(tag_generation_key(tag), TAG_GENERATION_EXPIRY)
+    pipe.publish(INVALIDATION_CHANNEL, ",".join(tags))  # Other processes' local caches
+    pipe.execute()
+
+    # Workers and CLI commands that never served a local=True view have no local cache to update
+    local_cache = existing_local_cache()
+    if local_cache is not None:
+        local_cache.invalidate(tags)
+
+def cached_json_response(body, etag):
+    """
+    Response for a serialized JSON body, sent as-is without decoding it again.
+    A client that already has this ETag gets an empty 304 instead.
+    """
+    response = current_app.response_class(body, mimetype=current_app.json.mimetype)
+    response.set_etag(etag)
+    # Browsers keep the copy but revalidate it on every request, per signed in user
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Authorization')
+    return response.make_conditional(request)
+
+def read_cached_entry(redis, cache_key, tags):
+    """
+    The entry and the current generations of its tags, in one round trip.
+    Returns (entry, stamp), entry is (etag, body, fresh_until, compute_seconds) or None
+    when missing or invalidated since it was stored.
+    """
+    pipe = redis.pipeline(transaction=False)
+    pipe.get(cache_key)
+    if tags:
+        pipe.mget([tag_generation_key(tag) for tag in tags])
+    cached, *generations = pipe.execute()
+    stamp = ",".join(generation or "0" for generation in (generations[0] if generations else []))
+
+    if cached:
+        # Stored as "<stamp>\n<etag> <fresh_until> <compute_seconds>\n<body>"
+        parts = cached.split("\n", 2)
+        if len(parts) == 3 and parts[0] == stamp:
+            meta = parts[1].split(" ")
+            if len(meta) == 3:
+                return (meta[0], parts[2].encode('utf-8'), float(meta[1]), float(meta[2])), stamp
+    return None, stamp
+
+def acquire_recompute_lock(redis, cache_key):
+    """Single-flight: only the request holding this lock rebuilds the entry. Returns the lock token or None."""
+    token = uuid.uuid4().hex
+    if redis.set(f"lock:{cache_key}", token, nx=True, px=int(CACHE_LOCK_SECONDS * 1000)):
+        return token
+    return None
+
+def release_recompute_lock(redis, cache_key, token):
+    redis.register_script(_RELEASE_LOCK_SCRIPT)(keys=[f"lock:{cache_key}"], args=[token])
+
+def cache_response(ttl=60, user_scope=False, tags=(), local=False, early_refresh=False):
+    """
+    Cache a view's 200 responses in Redis, serialized once with their ETag.
+
+    On a miss one request rebuilds the entry under a lock. The others serve the expired copy
+    (kept CACHE_STALE_SECONDS past its TTL) or, when there is none or it was invalidated,
+    wait up to CACHE_LOCK_WAIT_SECONDS for the rebuilt one. Fresh lifetimes get up to
+    CACHE_TTL_JITTER of random shortening so entries written together don't expire together.
+
+    :param tags: What the response is built from (e.g. "subjects", "questions:{quiz_id}"),
+                 invalidate_cache_tags on any of them drops the cached copy.
+    :param local: Also keep hits in this process's LRU (CACHE_L1_*), for hot, rarely changing views
+    :param early_refresh: Rebuild hot entries shortly before they expire, with a probability that
+                          grows as expiry nears and with how long the view takes (XFetch)
+    """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
             redis = get_redis()
             if user_scope:
-                user = get_current_user_or_abort()
-                cache_key = f"cache:{request.path}:user:{user.id}:{str(sorted(request.args.items()))}"
+                cache_key = f"cache:{request.path}:user:{get_jwt_identity()}:{str(sorted(request.args.items()))}"
             else:
                 cache_key = f"cache:{request.path}:{str(sorted(request.args.items()))}"
+            resolved_tags = cache_tags_for(tags, user_scope, **kwargs)
 
-            cached = redis.get(cache_key)
-            print("Cache key:", cache_key, "Cache hit:", bool(cached))
-
-            if cached:
-                return make_response(json.loads(cached), 200)
-            result = func(*args, **kwargs)
+            local_cache = get_local_cache(redis, current_app.config) if local else None
+            if local_cache is not None:
+                local_stamp = local_cache.stamp(resolved_tags)
+                hit = local_cache.get(cache_key, resolved_tags)
+                if hit:
+                    return cached_json_response(*hit)
 
-            if isinstance(result, tuple):
-                response, status = result
+            entry, stamp = read_cached_entry(redis, cache_key, resolved_tags)
+            lock = None
+            if entry:
+                etag, body, fresh_until, compute_seconds = entry
+                now = time.time()
+                expired = now >= fresh_until
+                refresh = expired or (
+                    early_refresh and now - compute_seconds * math.log(1.0 - random.random()) >= fresh_until
+                )
+                if refresh:
+                    lock = acquire_recompute_lock(redis, cache_key)
+                print("Cache key:", cache_key, "Cache hit:", not expired, "Refreshing:", bool(lock))
+                if not lock:
+                    # Fresh, or another request is already rebuilding the expired copy
+                    if local_cache is not None and not expired:
+                        local_cache.set(cache_key, local_stamp, body, etag, fresh_until - now)
+                    return cached_json_response(body, etag)
             else:
-                response, status = result, 200
+                print("Cache key:", cache_key, "Cache hit:", False)
+                lock = acquire_recompute_lock(redis, cache_key)
+                deadline = time.monotonic() + CACHE_LOCK_WAIT_SECONDS
+                while not lock and time.monotonic() < deadline:
+                    time.sleep(CACHE_LOCK_POLL_SECONDS)
+                    entry, stamp = read_cached_entry(redis, cache_key, resolved_tags)
+                    if entry:
+                        etag, body, _, _ = entry
+                        return cached_json_response(body, etag)
+                    lock = acquire_recompute_lock(redis, cache_key)
+
+            try:
+                started = time.monotonic()
+                result = func(*args, **kwargs)
+                compute_seconds = time.monotonic() - started
+
+                if isinstance(result, tuple):
+                    response, status = result
+                else:
+                    response, status = result, 200
 
-            if status == 200:
-                redis.setex(cache_key, ttl, json.dumps(response))
+                if status != 200:
+                    return make_response(response, status)
 
-            return make_response(response, status)
+                body = current_app.json.response(response).get_data()
+                etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+                fresh_for = ttl * (1 - random.random() * CACHE_TTL_JITTER)
+                # Stamped with the generations read before the view ran, so a concurrent write leaves it stale
+                redis.setex(
+                    cache_key,
+                    int(fresh_for + CACHE_STALE_SECONDS),
+                    f"{stamp}\n{etag} {time.time() + fresh_for:.3f} {compute_seconds:.4f}\n{body.decode('utf-8')}"
+                )
+                if local_cache is not None:
+                    local_cache.set(cache_key, local_stamp, body, etag, fresh_for)
+                return cached_json_response(body, etag)
+            finally:
+                if lock:
+                    release_recompute_lock(redis, cache_key, lock)
         return wrapper
     return decorator
 
-def invalidate_cache_by_prefix(prefix):
-    redis = get_redis()
-    cursor = 0
-    while True:
-        cursor, keys = redis.scan(cursor=cursor, match=f"{prefix}*")
-        if keys:
-            keys = [k.decode('utf-8') if isinstance(k, bytes) else k for k in keys]
-            redis.delete(*keys)
-        if cursor == 0:
-            break
-
 def invalidate_cache_for_subjects():
-    invalidate_cache_by_prefix("cache:/api/admin/subjects")
+    invalidate_cache_tags("subjects")
 
 def invalidate_cache_for_chapters():
-    invalidate_cache_by_prefix("cache:/api/admin/chapters")
-    invalidate_cache_by_prefix("cache:/api/admin/subjects")
+    invalidate_cache_tags("chapters")
 
 def invalidate_cache_for_quizzes():
-    invalidate_cache_by_prefix("cache:/api/admin/quiz")
-    invalidate_cache_by_prefix("cache:/api/admin/quizzes")
+    invalidate_cache_tags("quizzes")
 
 def invalidate_cache_for_questions(quiz_id=None):
-    invalidate_cache_by_prefix("cache:/api/admin/questions")
-
     if quiz_id is not None:
-        invalidate_cache_by_prefix(f"cache:/api/admin/quizzes/{quiz_id}/questions")
-
-    invalidate_cache_by_prefix("cache:/api/admin/quizzes")
-    invalidate_cache_by_prefix("cache:/api/admin/quiz")
+        invalidate_cache_tags("questions", f"questions:{quiz_id}")
+    else:
+        invalidate_cache_tags("questions")
 
 def invalidate_cache_for_users():
-    invalidate_cache_by_prefix("cache:/api/admin/users")
+    invalidate_cache_tags("users")
 
 def invalidate_user_profile_cache(user_id=None):
     if user_id is None:
         raise ValueError("user_id is required")
-    invalidate_cache_by_prefix(f"cache:/api/user/profile:user:{user_id}")
+    invalidate_cache_tags(f"user:{user_id}")
+
+def invalidate_cache_for_user_scores(user_ids):
+    """New scores change these users' own (user scoped) views."""
+    if user_ids:
+        invalidate_cache_tags(*(f"user:{user_id}" for user_id in user_ids))
+
+
+# Rate limiting: one script call per request, counted per signed in user (per IP otherwise),
+# endpoint and method. Redis TIME is the clock so every worker agrees on the window.
+_SLIDING_WINDOW_SCRIPT = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now_ms - window)
+-- Requests already let through by a worker's local allowance
+for i = 1, tonumber(ARGV[3]) do
+    redis.call('ZADD', KEYS[1], now_ms, ARGV[4] .. ':' .. i)
+end
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+local retry_after = 0
+if count < limit then
+    redis.call('ZADD', KEYS[1], now_ms, ARGV[4])
+    count = count + 1
+    allowed = 1
+else
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    retry_after = tonumber(oldest[2]) + window - now_ms
+end
+redis.call('PEXPIRE', KEYS[1], window)
+return {allowed, math.max(limit - count, 0), retry_after}
+"""
+
+_TOKEN_BUCKET_SCRIPT = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local capacity = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local rate = capacity / window  -- Tokens per millisecond, a full bucket refills in one window
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now_ms
+tokens = math.min(capacity, tokens + math.max(now_ms - ts, 0) * rate) - tonumber(ARGV[3])
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now_ms)
+redis.call('PEXPIRE', KEYS[1], window)
+return {allowed, math.max(math.floor(tokens), 0), retry_after}
+"""
+
+RATE_LIMIT_SCRIPTS = {
+    "sliding_window": _SLIDING_WINDOW_SCRIPT,  # Exact count of the requests in the last window seconds
+    "token_bucket": _TOKEN_BUCKET_SCRIPT,  # Bursts up to limit, then limit per window at a steady rate
+}
+RATE_LIMIT_LOCAL_HEADROOM = 0.5  # Local allowances are only handed out while half the limit is unused
+RATE_LIMIT_LOCAL_MAX_SECONDS = 5  # Longest a local allowance is trusted
+RATE_LIMIT_LOCAL_MAX_KEYS = 10000
+
+# key -> [requests still allowed locally, requests allowed locally so far, expires_at]
+_local_allowances = {}
+_local_allowances_pid = None
+_local_allowances_lock = threading.Lock()
+
+def rate_limit_key(mode, per_user=True):
+    identity = None
+    if per_user:
+        try:
+            identity = get_jwt_identity()
+        except RuntimeError:
+            pass  # No JWT verified for this request
+    scope = f"user:{identity}" if identity is not None else f"ip:{request.remote_addr}"
+    return f"rate_limit:{mode}:{scope}:{request.endpoint}:{request.method}"
 
+def _take_local_allowance(key):
+    """(True, 0) when the request can be let through locally, else (False, requests to report to Redis)."""
+    global _local_allowances, _local_allowances_pid
+    with _local_allowances_lock:
+        if _local_allowances_pid != os.getpid():
+            _local_allowances = {}
+            _local_allowances_pid = os.getpid()
+        allowance = _local_allowances.get(key)
+        if allowance is None:
+            return False, 0
+        if allowance[0] > 0 and allowance[2] > time.monotonic():
+            allowance[0] -= 1
+            allowance[1] += 1
+            return True, 0
+        del _local_allowances[key]
+        return False, allowance[1]
+
+def _grant_local_allowance(key, limit, window, remaining, fraction):
+    if remaining < limit * RATE_LIMIT_LOCAL_HEADROOM:
+        return
+    grant = int(remaining * fraction)
+    if grant < 1:
+        return
+    with _local_allowances_lock:
+        if len(_local_allowances) >= RATE_LIMIT_LOCAL_MAX_KEYS:
+            now = time.monotonic()
+            for stale_key in [k for k, allowance in _local_allowances.items() if allowance[2] <= now]:
+                del _local_allowances[stale_key]
+            if len(_local_allowances) >= RATE_LIMIT_LOCAL_MAX_KEYS:
+                return
+        _local_allowances[key] = [grant, 0, time.monotonic() + min(window * fraction, RATE_LIMIT_LOCAL_MAX_SECONDS)]
+
+def check_rate_limit(key, limit, window, mode="sliding_window"):
+    """
+    Count one request against key in a single Redis round trip.
+    Returns (allowed, remaining, retry_after_ms), remaining is None for locally allowed requests.
+
+    With RATE_LIMIT_LOCAL_FRACTION set, a client well under its limit gets that fraction of its
+    remaining requests allowed in-process, reported to Redis with its next counted request.
+    Each worker can then exceed the limit by at most that fraction of it.
+    """
+    fraction = current_app.config.get('RATE_LIMIT_LOCAL_FRACTION', 0)
+    pending = 0
+    if fraction:
+        allowed, pending = _take_local_allowance(key)
+        if allowed:
+            return True, None, 0
+
+    script = get_redis().register_script(RATE_LIMIT_SCRIPTS[mode])
+    allowed, remaining, retry_after = script(keys=[key], args=[limit, int(window * 1000), pending, uuid.uuid4().hex])
+
+    if fraction and allowed:
+        _grant_local_allowance(key, limit, window, remaining, fraction)
+    return bool(allowed), remaining, retry_after
+
+def rate_limit(limit=100, window=60, mode="sliding_window", per_user=True):   # 100 requests per minute
+    """
+    :param mode: "sliding_window" or "token_bucket"
+    :param per_user: Count signed in users by identity instead of by IP
+    """
+    if mode not in RATE_LIMIT_SCRIPTS:
+        raise ValueError(f"Unknown rate limit mode: {mode}")
 
-def rate_limit(limit=100, window=60):   # 100 requests per minute
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            redis = get_redis()
-            ip = request.remote_addr
-            key = f"rate_limit:{ip}:{request.endpoint}"
-            current = redis.get(key)
-            if current:
-                current = int(current)
-                if current >= limit:
-                    return {"msg": "Rate limit exceeded. Try again later."}, 429
-                else:
-                    redis.incr(key)
-            else:
-                redis.setex(key, window, 1)
+            allowed, _, retry_after = check_rate_limit(rate_limit_key(mode, per_user), limit, window, mode)
+            if not allowed:
+                return (
+                    {"msg": "Rate limit exceeded. Try again later."},
+                    429,
+                    {"Retry-After": str(max(1, math.ceil(retry_after / 1000)))}
+                )
             return func(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
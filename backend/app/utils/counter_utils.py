@@ -0,0 +1,175 @@
+from sqlalchemy import func
+from app.extensions import db
+from app.models import User, Subject, Chapter, Quiz, Question, RoleEnum, UserStatusEnum
+from app.utils.cache_utils import get_redis
+
+COUNTERS_KEY = "dashboard:counters"
+
+COUNTER_FIELDS = (
+    "total_users",
+    "active_users",
+    "suspended_users",
+    "verified_users",
+    "unverified_users",
+    "total_subjects",
+    "total_chapters",
+    "total_quizzes",
+    "total_questions",
+    "subjects_without_chapters",
+    "chapters_without_quizzes",
+)
+
+
+def compute_counters():
+    """Count everything from the database (used to seed and reconcile)."""
+    non_admin = User.query.filter(User.role != RoleEnum.ADMIN)
+    chapters_per_subject = (
+        db.session.query(Chapter.subject_id)
+        .group_by(Chapter.subject_id)
+        .subquery()
+    )
+    quizzes_per_chapter = (
+        db.session.query(Quiz.chapter_id)
+        .group_by(Quiz.chapter_id)
+        .subquery()
+    )
+    total_subjects = Subject.query.count()
+    total_chapters = Chapter.query.count()
+
+    return {
+        "total_users": non_admin.count(),
+        "active_users": non_admin.filter(User.status == UserStatusEnum.ACTIVE).count(),
+        "suspended_users": non_admin.filter(User.status == UserStatusEnum.SUSPENDED).count(),
+        "verified_users": non_admin.filter(User.is_verified == True).count(),
+        "unverified_users": non_admin.filter(User.is_verified == False).count(),
+        "total_subjects": total_subjects,
+        "total_chapters": total_chapters,
+        "total_quizzes": Quiz.query.count(),
+        "total_questions": Question.query.count(),
+        "subjects_without_chapters": total_subjects - db.session.query(func.count()).select_from(chapters_per_subject).scalar(),
+        "chapters_without_quizzes": total_chapters - db.session.query(func.count()).select_from(quizzes_per_chapter).scalar(),
+    }
+
+
+def reconcile_counters():
+    counters = compute_counters()
+    get_redis().hset(COUNTERS_KEY, mapping=counters)
+    return counters
+
+
+def get_counters():
+    stored = get_redis().hgetall(COUNTERS_KEY)
+    if any(field not in stored for field in COUNTER_FIELDS):
+        return reconcile_counters()
+    return {field: int(stored[field]) for field in COUNTER_FIELDS}
+
+
+def adjust_counters(**deltas):
+    """Apply deltas after a committed write. A missing hash is seeded on the next read."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    pipe = get_redis().pipeline()
+    for field, delta in deltas.items():
+        pipe.hincrby(COUNTERS_KEY, field, delta)
+    pipe.execute()
+
+
+# --- Users ---
+
+def user_counter_snapshot(user):
+    """The counters a user contributes to (empty for admins and deleted users)."""
+    if user is None or user.role == RoleEnum.ADMIN:
+        return {}
+    return {
+        "total_users": 1,
+        "active_users": int(user.status == UserStatusEnum.ACTIVE),
+        "suspended_users": int(user.status == UserStatusEnum.SUSPENDED),
+        "verified_users": int(bool(user.is_verified)),
+        "unverified_users": int(not user.is_verified),
+    }
+
+
+def adjust_user_counters(before, after):
+    """Apply the difference between two user snapshots."""
+    fields = set(before) | set(after)
+    adjust_counters(**{field: after.get(field, 0) - before.get(field, 0) for field in fields})
+
+
+# --- Content ---
+
+def _quiz_totals(quiz_filter):
+    count, questions = (
+        db.session.query(func.count(Quiz.id), func.coalesce(func.sum(Quiz.question_count), 0))
+        .filter(quiz_filter)
+        .one()
+    )
+    return count, questions
+
+
+def subject_delete_deltas(subject):
+    chapter_ids = [chapter_id for chapter_id, in db.session.query(Chapter.id).filter_by(subject_id=subject.id)]
+    quizzes, questions = _quiz_totals(Quiz.chapter_id.in_(chapter_ids)) if chapter_ids else (0, 0)
+    chapters_with_quizzes = (
+        db.session.query(func.count(func.distinct(Quiz.chapter_id)))
+        .filter(Quiz.chapter_id.in_(chapter_ids))
+        .scalar()
+    ) if chapter_ids else 0
+    return {
+        "total_subjects": -1,
+        "subjects_without_chapters": -1 if not chapter_ids else 0,
+        "total_chapters": -len(chapter_ids),
+        "chapters_without_quizzes": -(len(chapter_ids) - chapters_with_quizzes),
+        "total_quizzes": -quizzes,
+        "total_questions": -questions,
+    }
+
+
+def chapter_create_deltas(subject_id):
+    """Deltas for a chapter about to be added to subject_id."""
+    had_chapters = db.session.query(Chapter.query.filter_by(subject_id=subject_id).exists()).scalar()
+    return {
+        "total_chapters": 1,
+        "chapters_without_quizzes": 1,
+        "subjects_without_chapters": 0 if had_chapters else -1,
+    }
+
+
+def chapter_delete_deltas(chapter):
+    quizzes, questions = _quiz_totals(Quiz.chapter_id == chapter.id)
+    siblings = Chapter.query.filter(Chapter.subject_id == chapter.subject_id, Chapter.id != chapter.id)
+    return {
+        "total_chapters": -1,
+        "chapters_without_quizzes": -1 if not quizzes else 0,
+        "subjects_without_chapters": 0 if db.session.query(siblings.exists()).scalar() else 1,
+        "total_quizzes": -quizzes,
+        "total_questions": -questions,
+    }
+
+
+def quiz_create_deltas(chapter_id):
+    """Deltas for a quiz about to be added to chapter_id."""
+    had_quizzes = db.session.query(Quiz.query.filter_by(chapter_id=chapter_id).exists()).scalar()
+    return {
+        "total_quizzes": 1,
+        "chapters_without_quizzes": 0 if had_quizzes else -1,
+    }
+
+
+def quiz_move_deltas(quiz, new_chapter_id):
+    """Deltas for moving quiz from its current chapter to new_chapter_id."""
+    left_behind = Quiz.query.filter(Quiz.chapter_id == quiz.chapter_id, Quiz.id != quiz.id)
+    had_quizzes = db.session.query(Quiz.query.filter_by(chapter_id=new_chapter_id).exists()).scalar()
+    return {
+        "chapters_without_quizzes": (0 if db.session.query(left_behind.exists()).scalar() else 1)
+                                    + (0 if had_quizzes else -1),
+    }
+
+
+def quiz_delete_deltas(quiz):
+    siblings = Quiz.query.filter(Quiz.chapter_id == quiz.chapter_id, Quiz.id != quiz.id)
+    return {
+        "total_quizzes": -1,
+        "total_questions": -quiz.question_count,
+        "chapters_without_quizzes": 0 if db.session.query(siblings.exists()).scalar() else 1,
+    }
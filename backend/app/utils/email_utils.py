@@ -1,23 +1,17 @@
 import smtplib
+import threading
+import time
 from email.message import EmailMessage
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 import os
 from app.extensions import get_mail_config
+from app.utils.template_utils import render_template
 
-# Setup Jinja2 environment for email templates
-template_env = Environment(
-    loader=FileSystemLoader(os.path.join(os.path.dirname(__file__), '..', 'templates')),
-    autoescape=select_autoescape(['html', 'xml'])
-)
+MAX_MESSAGES_PER_CONNECTION = 100  # Many servers cap messages per session
+IDLE_CHECK_SECONDS = 30  # Sessions idle longer than this are checked with NOOP before reuse
 
-def render_template(template_name, **context):
-    """Render Jinja2 email template."""
-    template = template_env.get_template(template_name)
-    return template.render(context)
-
-def send_email(to, subject, body=None, html=None, template_name=None, context=None, attachments=None, cc=None, bcc=None):
+def build_message(to, subject, body=None, html=None, template_name=None, context=None, attachments=None, cc=None, bcc=None, sender=None):
     """
-    Send an email using SMTP with support for HTML, templates, and attachments.
+    Build an EmailMessage with support for HTML, templates, and attachments.
 
     :param to: str or list of recipient emails
     :param subject: Email subject
@@ -28,11 +22,11 @@ def send_email(to, subject, body=None, html=None, template_name=None, context=No
     :param attachments: List of (filename, content_bytes, mimetype)
     :param cc: Optional list of CC addresses
     :param bcc: Optional list of BCC addresses
+    :param sender: From address (defaults to MAIL_DEFAULT_SENDER)
     """
-    config = get_mail_config()
     msg = EmailMessage()
     msg['Subject'] = subject
-    msg['From'] = config['MAIL_DEFAULT_SENDER']
+    msg['From'] = sender or get_mail_config()['MAIL_DEFAULT_SENDER']
     msg['To'] = to if isinstance(to, str) else ', '.join(to)
     if cc:
         msg['Cc'] = ', '.join(cc)
@@ -40,12 +34,10 @@ def send_email(to, subject, body=None, html=None, template_name=None, context=No
         msg['Bcc'] = ', '.join(bcc)
 
     # Generate content
-    if template_name:
-        html_body = render_template(template_name, **(context or {}))
-        text_body = body or "This is an HTML email. Please view in a compatible client."
-    else:
-        html_body = html
-        text_body = body
+    html_body = render_template(template_name, **(context or {})) if template_name else html
+    text_body = body
+    if html_body and not text_body:
+        text_body = "This is an HTML email. Please view in a compatible client."
 
     msg.set_content(text_body)
 
@@ -57,25 +49,135 @@ def send_email(to, subject, body=None, html=None, template_name=None, context=No
             maintype, subtype = mimetype.split('/')
             msg.add_attachment(content, maintype=maintype, subtype=subtype, filename=filename)
 
-    # Send via SMTP
-    try:
-        with smtplib.SMTP(config["MAIL_SERVER"], config["MAIL_PORT"]) as server:
+    return msg
+
+
+class SMTPMailer:
+    """
+    A persistent SMTP session reused across messages.
+    Reconnects when the server drops the session and retries the message once.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.server = None
+        self.sent_on_connection = 0
+        self.last_used = 0
+        self.lock = threading.Lock()
+
+    def connect(self):
+        self.close()
+        config = self.config
+        smtp_class = smtplib.SMTP_SSL if config.get("MAIL_USE_SSL") else smtplib.SMTP
+        server = smtp_class(config["MAIL_SERVER"], config["MAIL_PORT"], timeout=30)
+        server.ehlo()
+        print("SMTP server features:", server.esmtp_features)
+
+        if config.get("MAIL_USE_TLS"):
+            server.starttls()
             server.ehlo()
-            print("SMTP server features:", server.esmtp_features)
-
-            if config.get("MAIL_USE_TLS"):
-                server.starttls()
-                server.ehlo()   
-                print("SMTP server features after STARTTLS:", server.esmtp_features)
-
-            if (config["MAIL_USERNAME"] and config["MAIL_PASSWORD"] and'auth' in server.esmtp_features):
-                print("SMTP server supports AUTH, logging in...")
-                server.login(config["MAIL_USERNAME"], config["MAIL_PASSWORD"])
-            else:
-                print("SMTP server does not support AUTH or credentials missing, skipping login.")
-            
-            server.send_message(msg)
+            print("SMTP server features after STARTTLS:", server.esmtp_features)
+
+        if (config["MAIL_USERNAME"] and config["MAIL_PASSWORD"] and 'auth' in server.esmtp_features):
+            print("SMTP server supports AUTH, logging in...")
+            server.login(config["MAIL_USERNAME"], config["MAIL_PASSWORD"])
+        else:
+            print("SMTP server does not support AUTH or credentials missing, skipping login.")
+
+        self.server = server
+        self.sent_on_connection = 0
+        self.last_used = time.monotonic()
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.server = None
+
+    def _usable(self):
+        if self.server is None or self.sent_on_connection >= MAX_MESSAGES_PER_CONNECTION:
+            return False
+        if time.monotonic() - self.last_used > IDLE_CHECK_SECONDS:
+            try:
+                return self.server.noop()[0] == 250
+            except (smtplib.SMTPException, OSError):
+                return False
+        return True
+
+    def _send(self, msg):
+        if not self._usable():
+            self.connect()
+        try:
+            self.server.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self.connect()
+            self.server.send_message(msg)
+        self.sent_on_connection += 1
+        self.last_used = time.monotonic()
+
+    def send(self, msg):
+        with self.lock:
+            self._send(msg)
+
+    def send_many(self, messages):
+        """
+        Send EmailMessages over one session.
+        A failed message is reported and skipped. Returns the number sent.
+        """
+        sent = 0
+        with self.lock:
+            for msg in messages:
+                try:
+                    self._send(msg)
+                    sent += 1
+                except Exception as e:
+                    print(f"Error sending email to {msg['To']}: {e}")
+                    if not isinstance(e, smtplib.SMTPRecipientsRefused):
+                        self.close()
+        return sent
+
+
+# One session per worker process, rebuilt after a fork or a mail config change
+_mailer = None
+_mailer_key = None
+
+def get_mailer():
+    global _mailer, _mailer_key
+    config = get_mail_config()
+    key = (os.getpid(), config["MAIL_SERVER"], config["MAIL_PORT"], config["MAIL_USERNAME"],
+           config["MAIL_USE_TLS"], config["MAIL_USE_SSL"])
+    if _mailer is None or _mailer_key != key:
+        if _mailer is not None and _mailer_key[0] == key[0]:
+            _mailer.close()
+        _mailer = SMTPMailer(config)
+        _mailer_key = key
+    return _mailer
+
+def send_email(to, subject, body=None, html=None, template_name=None, context=None, attachments=None, cc=None, bcc=None):
+    """
+    Send an email using SMTP with support for HTML, templates, and attachments.
+    Takes the same arguments as build_message and reuses the worker's SMTP session.
+    """
+    msg = build_message(to, subject, body=body, html=html, template_name=template_name,
+                        context=context, attachments=attachments, cc=cc, bcc=bcc)
+    mailer = get_mailer()
+    try:
+        mailer.send(msg)
         print(f"Email sent to {msg['To']}")
     except Exception as e:
+        mailer.close()
         print(f"Error sending email to {msg['To']}: {e}")
-         
\ No newline at end of file
+
+def send_many(messages):
+    """
+    Send several emails over one SMTP session.
+
+    :param messages: Iterable of dicts of send_email keyword arguments
+    :return: Number of messages sent
+    """
+    messages = [build_message(**message) for message in messages]
+    sent = get_mailer().send_many(messages)
+    print(f"Sent {sent}/{len(messages)} emails")
+    return sent
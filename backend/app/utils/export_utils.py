@@ -0,0 +1,150 @@
+import csv
+import gzip
+import os
+import shutil
+import time
+from flask import current_app, request, send_file, Response
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def export_dir():
+    path = current_app.config['EXPORT_DIR']
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def export_path(filename):
+    return os.path.join(export_dir(), os.path.basename(filename))
+
+
+SHARD_DIR_PREFIX = "all_scores_"
+SHARD_DIR_SUFFIX = "_parts"
+
+
+def shard_dir(job_id):
+    """
+    Directory holding a sharded export's part files. Only the merge or the chord's errback
+    removes it, remove_expired_exports leaves directories alone.
+    """
+    return export_path(f"{SHARD_DIR_PREFIX}{job_id}{SHARD_DIR_SUFFIX}")
+
+
+def shard_filename(part):
+    return f"part{part:04d}.csv.gz"
+
+
+def remove_export_shards(job_id):
+    """Remove a sharded export's part files, including partly written ones."""
+    shutil.rmtree(shard_dir(job_id), ignore_errors=True)
+
+
+def remove_orphaned_shards(active_job_ids):
+    """
+    Remove shard directories of jobs that are no longer running, left behind by a worker
+    that died before the merge or the errback. Returns the number of directories removed.
+    """
+    removed = 0
+    for entry in os.scandir(export_dir()):
+        name = entry.name
+        if not (entry.is_dir() and name.startswith(SHARD_DIR_PREFIX) and name.endswith(SHARD_DIR_SUFFIX)):
+            continue
+        job_id = name[len(SHARD_DIR_PREFIX):-len(SHARD_DIR_SUFFIX)]
+        if job_id.isdigit() and int(job_id) not in active_job_ids:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def write_csv_gz(filename, header, rows, directory=None):
+    """
+    Write rows to a gzip-compressed CSV one at a time, so memory use doesn't grow with the export.
+    The file only appears under its final name once it is complete. Returns the number of rows.
+    Pass header=None for a headerless shard, and its job's shard_dir as directory.
+    """
+    if directory is None:
+        path = export_path(filename)
+    else:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, os.path.basename(filename))
+    tmp_path = f"{path}.tmp"
+    count = 0
+    try:
+        with gzip.open(tmp_path, 'wt', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if header:
+                writer.writerow(header)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+def iter_decompressed(path):
+    """Stream a gzip file's contents for clients that don't accept gzip encoding."""
+    with gzip.open(path, 'rb') as f:
+        while True:
+            chunk = f.read(EXPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def send_export(path, download_name):
+    """
+    Serve a stored export as CSV. Clients that accept gzip get the file as-is with
+    Content-Encoding: gzip and decompress it themselves, others get a decompressing stream.
+    """
+    if "gzip" in request.accept_encodings:
+        response = send_file(path, mimetype="text/csv", as_attachment=True, download_name=download_name)
+        response.headers["Content-Encoding"] = "gzip"
+        return response
+
+    return Response(
+        iter_decompressed(path),
+        mimetype="text/csv",
+        headers={
+            "Content-Disposition": f"attachment; filename={download_name}"
+        }
+    )
+
+
+def merge_csv_gz(filename, header, part_paths):
+    """
+    Join shard files into one export. Concatenated gzip members form a valid gzip stream,
+    so shards are copied byte for byte behind a header member without recompressing.
+    """
+    path = export_path(filename)
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as out:
+            with gzip.open(out, 'wt', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerow(header)
+            for part_path in part_paths:
+                with open(part_path, 'rb') as f:
+                    shutil.copyfileobj(f, out, EXPORT_CHUNK_SIZE)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def remove_expired_exports(max_age_seconds):
+    """
+    Remove export files (and leftovers of failed writes) older than max_age_seconds.
+    Shard directories are skipped, their job may still be writing to them.
+    """
+    path = export_dir()
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(path):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+            removed += 1
+    return removed
@@ -0,0 +1,104 @@
+from app.extensions import db
+from app.models import User, UserStatsAggregate, RoleEnum
+from app.utils.cache_utils import get_redis
+
+LEADERBOARD_KEY = "leaderboard:average_percentage"
+
+
+def _average(stats):
+    return stats.percentage_sum / stats.attempt_count
+
+
+def rebuild_leaderboard():
+    """Reload the sorted set from the per-user aggregates."""
+    rows = (
+        db.session.query(UserStatsAggregate)
+        .join(User, User.id == UserStatsAggregate.user_id)
+        .filter(User.role != RoleEnum.ADMIN, UserStatsAggregate.attempt_count > 0)
+        .all()
+    )
+    pipe = get_redis().pipeline()
+    pipe.delete(LEADERBOARD_KEY)
+    if rows:
+        pipe.zadd(LEADERBOARD_KEY, {str(stats.user_id): _average(stats) for stats in rows})
+    pipe.execute()
+
+
+def sync_leaderboard(user_ids):
+    """Refresh (or drop) the given users' entries after their aggregates changed."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    redis = get_redis()
+    if not redis.exists(LEADERBOARD_KEY):
+        rebuild_leaderboard()
+        return
+
+    rows = (
+        db.session.query(UserStatsAggregate)
+        .join(User, User.id == UserStatsAggregate.user_id)
+        .filter(UserStatsAggregate.user_id.in_(user_ids), User.role != RoleEnum.ADMIN)
+        .all()
+    )
+    ranked = {stats.user_id: _average(stats) for stats in rows if stats.attempt_count}
+
+    pipe = redis.pipeline()
+    if ranked:
+        pipe.zadd(LEADERBOARD_KEY, {str(uid): avg for uid, avg in ranked.items()})
+    missing = [str(uid) for uid in user_ids if uid not in ranked]
+    if missing:
+        pipe.zrem(LEADERBOARD_KEY, *missing)
+    pipe.execute()
+
+
+def remove_from_leaderboard(user_id):
+    get_redis().zrem(LEADERBOARD_KEY, str(user_id))
+
+
+def _ensure_leaderboard():
+    redis = get_redis()
+    if not redis.exists(LEADERBOARD_KEY):
+        rebuild_leaderboard()
+    return redis
+
+
+def get_user_rank(user_id):
+    """1-based rank by average percentage, or None if the user has no attempts."""
+    rank = _ensure_leaderboard().zrevrank(LEADERBOARD_KEY, str(user_id))
+    return rank + 1 if rank is not None else None
+
+
+def get_top_users(limit=5):
+    """
+    Top users by average percentage as a list of dicts with
+    rank, user_id, full_name, username, average_score and quizzes_attempted.
+    """
+    top = _ensure_leaderboard().zrevrange(LEADERBOARD_KEY, 0, limit - 1, withscores=True)
+    if not top:
+        return []
+
+    user_ids = [int(uid) for uid, _ in top]
+    rows = (
+        db.session.query(User.id, User.full_name, User.username, UserStatsAggregate.attempt_count)
+        .join(UserStatsAggregate, UserStatsAggregate.user_id == User.id)
+        .filter(User.id.in_(user_ids))
+        .all()
+    )
+    details = {uid: (full_name, username, count) for uid, full_name, username, count in rows}
+
+    leaderboard = []
+    for i, (uid, avg_score) in enumerate(top):
+        uid = int(uid)
+        if uid not in details:
+            continue
+        full_name, username, count = details[uid]
+        leaderboard.append({
+            "rank": i + 1,
+            "user_id": uid,
+            "full_name": full_name,
+            "username": username,
+            "average_score": round(avg_score, 2),
+            "quizzes_attempted": count
+        })
+    return leaderboard
@@ -0,0 +1,112 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+
+class LocalCache:
+    """
+    In-process LRU of serialized responses, bounded by total body size and entry count.
+
+    Entries remember the local generation of each tag they depend on. Invalidation messages
+    from Redis pub/sub bump those generations, so stale entries miss and age out of the LRU.
+    """
+
+    def __init__(self, max_bytes, max_entries, ttl):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, stamp, body, etag)
+        self.size = 0
+        self.generations = {}  # tag -> local generation
+        self.lock = threading.Lock()
+
+    def stamp(self, tags):
+        with self.lock:
+            return tuple(self.generations.get(tag, 0) for tag in tags)
+
+    def get(self, key, tags):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, stamp, body, etag = entry
+            if expires_at < time.monotonic() or stamp != tuple(self.generations.get(tag, 0) for tag in tags):
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return body, etag
+
+    def set(self, key, stamp, body, etag, ttl):
+        """Store a response. stamp must come from stamp() before the response was read or built."""
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + min(ttl, self.ttl), stamp, body, etag)
+            self.size += len(body)
+            while self.size > self.max_bytes or len(self.entries) > self.max_entries:
+                _, (_, _, evicted, _) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def _remove(self, key):
+        _, _, body, _ = self.entries.pop(key)
+        self.size -= len(body)
+
+    def invalidate(self, tags):
+        with self.lock:
+            for tag in tags:
+                self.generations[tag] = self.generations.get(tag, 0) + 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+# One cache and subscriber thread per process, rebuilt after a fork
+_local_cache = None
+_local_cache_pid = None
+_local_cache_lock = threading.Lock()
+
+def existing_local_cache():
+    """The process's LocalCache if a local=True view already created it, without starting one."""
+    return _local_cache if _local_cache_pid == os.getpid() else None
+
+def get_local_cache(redis, config):
+    """
+    The process's LocalCache, or None when CACHE_L1_MAX_BYTES is 0. The first call starts
+    the invalidation subscriber, so only views that read the local cache should make it.
+    """
+    global _local_cache, _local_cache_pid
+    if not config.get('CACHE_L1_MAX_BYTES'):
+        return None
+    if _local_cache_pid == os.getpid():
+        return _local_cache
+
+    with _local_cache_lock:
+        if _local_cache_pid != os.getpid():
+            cache = LocalCache(config['CACHE_L1_MAX_BYTES'], config['CACHE_L1_MAX_ENTRIES'], config['CACHE_L1_TTL'])
+
+            def on_invalidate(message):
+                cache.invalidate(message['data'].split(','))
+
+            def on_error(error, pubsub, thread):
+                # Messages may have been missed while disconnected, the subscription is restored on the next read
+                logger.warning(f"Cache invalidation subscriber error: {error}")
+                cache.clear()
+                time.sleep(1)
+
+            pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{INVALIDATION_CHANNEL: on_invalidate})
+            pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=on_error)
+
+            _local_cache = cache
+            _local_cache_pid = os.getpid()
+    return _local_cache
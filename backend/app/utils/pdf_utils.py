@@ -1,25 +1,92 @@
-from jinja2 import Environment, FileSystemLoader
 from xhtml2pdf import pisa
+from celery import group
+from flask import current_app
+import base64
 import io
-import os
+import logging
+from app.utils.template_utils import render_template
 
-# Jinja2 setup
-template_env = Environment(
-    loader=FileSystemLoader(os.path.join(os.path.dirname(__file__), '..', 'templates'))
-)
+logger = logging.getLogger(__name__)
 
-def generate_pdf_from_template(template_name, context):
+def html_to_pdf(html):
     """
-    Renders HTML template and converts it to PDF.
+    Converts rendered HTML to PDF.
     """
-    template = template_env.get_template(template_name)
-    html_out = template.render(context)
     result = io.BytesIO()
-    pisa_status = pisa.CreatePDF(html_out, dest=result)
+    pisa_status = pisa.CreatePDF(html, dest=result)
 
     if pisa_status.err:
         raise Exception('Error generating PDF')
 
     pdf_bytes = result.getvalue()
     result.close()
-    return pdf_bytes
\ No newline at end of file
+    return pdf_bytes
+
+def generate_pdf_from_template(template_name, context):
+    """
+    Renders HTML template and converts it to PDF.
+    """
+    return html_to_pdf(render_template(template_name, **context))
+
+def pdf_render_queue():
+    """The PDF worker pool's queue, None when PDFs are converted inline."""
+    return current_app.config.get('PDF_RENDER_QUEUE')
+
+def render_pdf_signature(html):
+    """
+    Signature converting one document on the PDF worker pool, killed after PDF_RENDER_TIMEOUT.
+    The soft limit comes first so a render can fail cleanly, up to 5 seconds or half the timeout earlier.
+    """
+    timeout = current_app.config.get('PDF_RENDER_TIMEOUT', 60)
+    return current_app.celery.signature(
+        'render_pdf', args=[html], queue=pdf_render_queue(),
+        time_limit=timeout, soft_time_limit=max(timeout - 5, timeout / 2)
+    )
+
+def decode_pdf(result):
+    """A render_pdf result as PDF bytes, None if the conversion failed."""
+    if isinstance(result, str):
+        return base64.b64decode(result)
+    logger.error(f"Failed to generate PDF: {result!r}")
+    return None
+
+def forget_results(result_ids):
+    """Drop render results from the result backend once they have been collected."""
+    for result_id in result_ids:
+        current_app.celery.AsyncResult(result_id).forget()
+
+def render_pdfs(htmls):
+    """
+    Convert several HTML documents to PDF and wait for them.
+    With PDF_RENDER_QUEUE set they are converted in parallel by the PDF worker pool, each with a
+    PDF_RENDER_TIMEOUT time limit, otherwise inline in this process. Tasks that can chain their
+    work onto render_pdf_signature instead should, rather than holding a worker here.
+    Returns a list aligned with htmls, with None for documents that failed or timed out.
+    """
+    if not pdf_render_queue():
+        pdfs = []
+        for html in htmls:
+            try:
+                pdfs.append(html_to_pdf(html))
+            except Exception as e:
+                logger.error(f"Failed to generate PDF: {e}")
+                pdfs.append(None)
+        return pdfs
+
+    if not htmls:
+        return []
+
+    timeout = current_app.config.get('PDF_RENDER_TIMEOUT', 60)
+    job = group(render_pdf_signature(html) for html in htmls).apply_async()
+
+    try:
+        # The renders run in parallel, so this waits at most one render's time limit
+        results = job.get(timeout=timeout, propagate=False, disable_sync_subtasks=False)
+    except Exception as e:
+        logger.error(f"PDF worker pool did not respond: {e}")
+        job.revoke()
+        return [None] * len(htmls)
+    finally:
+        job.forget()
+
+    return [decode_pdf(result) for result in results]
@@ -0,0 +1,130 @@
+import json
+import time
+from app.extensions import db
+from app.models import Question
+from app.utils.cache_utils import get_redis, tag_generation_key, invalidate_cache_tags
+
+QUIZ_PAYLOAD_TTL = 3600
+ANSWER_KEY_TTL = 3600
+ANSWER_KEY_LOCAL_TTL = 5  # Seconds a worker trusts its in-process copy
+ANSWER_KEY_LOCAL_MAX = 256
+
+# quiz_id -> (expires_at, {question_id: correct_option})
+_local_answer_keys = {}
+
+
+def quiz_content_tag(quiz_id):
+    return f"questions:{quiz_id}"
+
+
+def read_quiz_content(redis, key, quiz_id):
+    """
+    A cached blob and the current generation of its quiz's content tag, in one round trip.
+    Returns (blob, generation), blob is None when missing or stored before the last invalidation.
+    """
+    pipe = redis.pipeline(transaction=False)
+    pipe.get(key)
+    pipe.get(tag_generation_key(quiz_content_tag(quiz_id)))
+    cached, generation = pipe.execute()
+    generation = generation or "0"
+    if cached:
+        # Stored as "<generation>\n<blob>"
+        stamp, _, blob = cached.partition("\n")
+        if stamp == generation:
+            return blob, generation
+    return None, generation
+
+
+def store_quiz_content(redis, key, generation, blob, ttl):
+    """generation must be read before blob was built, so a concurrent invalidation makes it miss."""
+    redis.setex(key, ttl, f"{generation}\n{blob}")
+
+
+def quiz_payload_key(quiz_id):
+    return f"quiz_payload:{quiz_id}"
+
+
+def build_quiz_payload(quiz):
+    """Serialize the part of the start-quiz response that is identical for every user."""
+    questions = Question.query.filter_by(quiz_id=quiz.id).order_by(Question.id).all()
+    return json.dumps({
+        "status": "available",
+        "quiz_id": quiz.id,
+        "quiz_name": quiz.name,
+        "time_duration": str(quiz.time_duration),
+        "questions": [
+            {
+                "serial_number": idx + 1,
+                "id": q.id,
+                "question_statement": q.question_statement,
+                "options": [
+                    {"value": 1, "text": q.option1},
+                    {"value": 2, "text": q.option2},
+                    {"value": 3, "text": q.option3},
+                    {"value": 4, "text": q.option4}
+                ]
+            }
+            for idx, q in enumerate(questions)
+        ]
+    })
+
+
+def get_quiz_payload(quiz):
+    """Pre-serialized JSON object for StartQuizResource, rendered once per quiz."""
+    redis = get_redis()
+    key = quiz_payload_key(quiz.id)
+    payload, generation = read_quiz_content(redis, key, quiz.id)
+    if payload is None:
+        payload = build_quiz_payload(quiz)
+        store_quiz_content(redis, key, generation, payload, QUIZ_PAYLOAD_TTL)
+    return payload
+
+
+def answer_key_key(quiz_id):
+    return f"quiz_answer_key:{quiz_id}"
+
+
+def load_answer_key(quiz_id):
+    rows = (
+        db.session.query(Question.id, Question.correct_option)
+        .filter(Question.quiz_id == quiz_id)
+        .order_by(Question.id)
+        .all()
+    )
+    return {question_id: correct_option for question_id, correct_option in rows}
+
+
+def get_answer_key(quiz_id):
+    """
+    {question_id: correct_option} for grading, without loading Question objects.
+    Checked in process memory first, then Redis, then the database.
+    """
+    now = time.monotonic()
+    local = _local_answer_keys.get(quiz_id)
+    if local and local[0] > now:
+        return local[1]
+
+    redis = get_redis()
+    key = answer_key_key(quiz_id)
+    blob, generation = read_quiz_content(redis, key, quiz_id)
+    if blob is not None:
+        answer_key = {question_id: correct_option for question_id, correct_option in json.loads(blob)}
+    else:
+        answer_key = load_answer_key(quiz_id)
+        store_quiz_content(redis, key, generation, json.dumps(list(answer_key.items())), ANSWER_KEY_TTL)
+
+    if quiz_id not in _local_answer_keys and len(_local_answer_keys) >= ANSWER_KEY_LOCAL_MAX:
+        _local_answer_keys.pop(next(iter(_local_answer_keys)))
+    _local_answer_keys[quiz_id] = (now + ANSWER_KEY_LOCAL_TTL, answer_key)
+    return answer_key
+
+
+def invalidate_quiz_content_cache(quiz_id):
+    """
+    Drop the cached quiz payload and answer key after its questions or details change.
+    Bumping the content tag also makes a copy built before this call, and stored after it, miss.
+    Other workers drop their in-process answer key within ANSWER_KEY_LOCAL_TTL.
+    """
+    invalidate_cache_tags(quiz_content_tag(quiz_id))
+    get_redis().delete(quiz_payload_key(quiz_id), answer_key_key(quiz_id))
+    _local_answer_keys.pop(quiz_id, None)
@@ -0,0 +1,103 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import time
+from flask import current_app
+from app.utils.template_utils import template_env, render_template
+from app.utils.pdf_utils import render_pdfs
+
+logger = logging.getLogger(__name__)
+
+MONTHLY_REPORT_TEMPLATE = "monthly_report.html"
+
+@functools.lru_cache(maxsize=None)
+def template_version(template_name):
+    """Hash of the template source. Templates don't reload at runtime, so it only changes on deploy."""
+    source, _, _ = template_env.loader.get_source(template_env, template_name)
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+def report_pdf_key(context):
+    """Content key of a report PDF: the same template and context always give the same PDF."""
+    payload = json.dumps(context, sort_keys=True, default=str)
+    return hashlib.sha256(f"{template_version(MONTHLY_REPORT_TEMPLATE)}:{payload}".encode('utf-8')).hexdigest()
+
+def report_pdf_path(key):
+    path = current_app.config['REPORT_PDF_DIR']
+    os.makedirs(path, exist_ok=True)
+    return os.path.join(path, f"{os.path.basename(key)}.pdf")
+
+def load_report_pdf(key):
+    try:
+        with open(report_pdf_path(key), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def store_report_pdf(key, pdf_bytes):
+    """Write the PDF under a temporary name first so readers never see a partial file."""
+    path = report_pdf_path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.error(f"Failed to store report PDF {key}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def monthly_report_html(context):
+    return render_template(MONTHLY_REPORT_TEMPLATE, **context)
+
+def missing_report_pdfs(contexts):
+    """Indexes of the contexts with no stored PDF yet."""
+    return [i for i, context in enumerate(contexts) if not os.path.exists(report_pdf_path(report_pdf_key(context)))]
+
+def remove_expired_report_pdfs(max_age_seconds, keep_keys):
+    """
+    Remove stored PDFs (and leftovers of failed writes) older than max_age_seconds, except
+    those under keep_keys. Returns the number of files removed.
+    """
+    path = current_app.config['REPORT_PDF_DIR']
+    if not os.path.isdir(path):
+        return 0
+    cutoff = time.time() - max_age_seconds
+    keep = {f"{key}.pdf" for key in keep_keys}
+    removed = 0
+    for entry in os.scandir(path):
+        if entry.is_file() and entry.name not in keep and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+def render_monthly_reports(contexts, converted=None):
+    """
+    Render monthly reports once each, for both the email body and the PDF attachment.
+    PDFs already stored for the same template and context are reused, the rest are
+    converted together so the PDF pool can work on them in parallel.
+    converted maps context indexes to PDFs the caller already had converted (None for a failed
+    one), those are stored and no other conversion is started.
+    Returns [(html, pdf_bytes)], pdf_bytes is None where the PDF conversion failed.
+    """
+    htmls = [monthly_report_html(context) for context in contexts]
+    keys = [report_pdf_key(context) for context in contexts]
+    pdfs = [load_report_pdf(key) for key in keys]
+
+    missing = [i for i, pdf in enumerate(pdfs) if pdf is None]
+    if converted is None:
+        converted = dict(zip(missing, render_pdfs([htmls[i] for i in missing])))
+    for i in missing:
+        pdf_bytes = converted.get(i)
+        if pdf_bytes is not None:
+            store_report_pdf(keys[i], pdf_bytes)
+            pdfs[i] = pdf_bytes
+
+    return list(zip(htmls, pdfs))
+
+def render_monthly_report(context):
+    return render_monthly_reports([context])[0]
@@ -0,0 +1,174 @@
+import click
+from flask.cli import with_appcontext
+from app.extensions import db
+from app.models import Score, Quiz, Chapter, UserStatsAggregate, UserSubjectStats
+from app.utils.leaderboard_utils import rebuild_leaderboard, sync_leaderboard
+
+
+def score_percentage(total_scored, max_score):
+    return (total_scored / max_score) * 100 if max_score > 0 else 0
+
+
+def performance_bucket(percentage):
+    """Bucket used by the user dashboard and summary charts."""
+    if percentage >= 80:
+        return "high"
+    elif percentage >= 40:
+        return "moderate"
+    return "low"
+
+
+def record_attempt(user_id, quiz, total_scored, max_score, time_taken, attempted_at):
+    """
+    Fold a new attempt into the user's aggregates.
+    Adds to the current session, the caller commits together with the Score row.
+    Counters are bumped with SQL expressions so concurrent submissions don't lose updates.
+    """
+    percentage = score_percentage(total_scored, max_score)
+    bucket_column = getattr(UserStatsAggregate, f"{performance_bucket(percentage)}_count")
+
+    updated = UserStatsAggregate.query.filter_by(user_id=user_id).update({
+        UserStatsAggregate.attempt_count: UserStatsAggregate.attempt_count + 1,
+        UserStatsAggregate.percentage_sum: UserStatsAggregate.percentage_sum + percentage,
+        UserStatsAggregate.total_time_taken: UserStatsAggregate.total_time_taken + time_taken,
+        bucket_column: bucket_column + 1,
+        UserStatsAggregate.last_quiz_id: quiz.id,
+        UserStatsAggregate.last_percentage: percentage,
+        UserStatsAggregate.last_attempt_at: attempted_at,
+    }, synchronize_session=False)
+
+    if not updated:
+        stats = UserStatsAggregate(
+            user_id=user_id,
+            attempt_count=1,
+            percentage_sum=percentage,
+            total_time_taken=time_taken,
+            high_count=0,
+            moderate_count=0,
+            low_count=0,
+            last_quiz_id=quiz.id,
+            last_percentage=percentage,
+            last_attempt_at=attempted_at
+        )
+        setattr(stats, f"{performance_bucket(percentage)}_count", 1)
+        db.session.add(stats)
+
+    subject_id = quiz.chapter.subject_id
+    updated = UserSubjectStats.query.filter_by(user_id=user_id, subject_id=subject_id).update({
+        UserSubjectStats.attempt_count: UserSubjectStats.attempt_count + 1,
+        UserSubjectStats.percentage_sum: UserSubjectStats.percentage_sum + percentage,
+    }, synchronize_session=False)
+
+    if not updated:
+        db.session.add(UserSubjectStats(
+            user_id=user_id,
+            subject_id=subject_id,
+            attempt_count=1,
+            percentage_sum=percentage
+        ))
+
+    return percentage
+
+
+def rebuild_user_stats(user_ids=None):
+    """
+    Recompute aggregates from the Score table.
+    Rebuilds every user when user_ids is None, otherwise only the given users.
+    """
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+
+    rows = (
+        db.session.query(
+            Score.user_id,
+            Score.quiz_id,
+            Score.total_scored,
+            Score.time_taken,
+            Score.time_stamp_of_attempt,
+            Chapter.subject_id,
+            Quiz.question_count
+        )
+        .join(Quiz, Score.quiz_id == Quiz.id)
+        .join(Chapter, Quiz.chapter_id == Chapter.id)
+        .order_by(Score.user_id, Score.time_stamp_of_attempt)
+    )
+    if user_ids is not None:
+        rows = rows.filter(Score.user_id.in_(user_ids))
+
+    user_stats = {}
+    subject_stats = {}
+
+    for user_id, quiz_id, total_scored, time_taken, attempted_at, subject_id, max_score in rows.yield_per(1000):
+        percentage = score_percentage(total_scored, max_score)
+
+        stats = user_stats.get(user_id)
+        if stats is None:
+            stats = user_stats[user_id] = UserStatsAggregate(
+                user_id=user_id,
+                attempt_count=0,
+                percentage_sum=0.0,
+                total_time_taken=0.0,
+                high_count=0,
+                moderate_count=0,
+                low_count=0
+            )
+        stats.attempt_count += 1
+        stats.percentage_sum += percentage
+        stats.total_time_taken += time_taken
+        bucket = f"{performance_bucket(percentage)}_count"
+        setattr(stats, bucket, getattr(stats, bucket) + 1)
+
+        # Rows are ordered by attempt time, so the last one seen wins
+        stats.last_quiz_id = quiz_id
+        stats.last_percentage = percentage
+        stats.last_attempt_at = attempted_at
+
+        subject = subject_stats.get((user_id, subject_id))
+        if subject is None:
+            subject = subject_stats[(user_id, subject_id)] = UserSubjectStats(
+                user_id=user_id,
+                subject_id=subject_id,
+                attempt_count=0,
+                percentage_sum=0.0
+            )
+        subject.attempt_count += 1
+        subject.percentage_sum += percentage
+
+    stale_stats = UserStatsAggregate.query
+    stale_subjects = UserSubjectStats.query
+    if user_ids is not None:
+        stale_stats = stale_stats.filter(UserStatsAggregate.user_id.in_(user_ids))
+        stale_subjects = stale_subjects.filter(UserSubjectStats.user_id.in_(user_ids))
+    stale_subjects.delete(synchronize_session=False)
+    stale_stats.delete(synchronize_session=False)
+
+    db.session.add_all(user_stats.values())
+    db.session.add_all(subject_stats.values())
+    db.session.commit()
+
+    if user_ids is None:
+        rebuild_leaderboard()
+    else:
+        sync_leaderboard(user_ids)
+
+    return len(user_stats)
+
+
+def users_with_scores_for(quiz_ids):
+    """Users whose aggregates include attempts on the given quizzes."""
+    quiz_ids = list(quiz_ids)
+    if not quiz_ids:
+        return set()
+    rows = db.session.query(Score.user_id).filter(Score.quiz_id.in_(quiz_ids)).distinct()
+    return {user_id for user_id, in rows}
+
+
+@click.command('rebuild-user-stats')
+@click.option('--user-id', 'user_ids', type=int, multiple=True, help="Only rebuild these users (repeatable).")
+@with_appcontext
+def rebuild_user_stats_command(user_ids):
+    """Backfill user score aggregates and the leaderboard from existing Score rows."""
+    rebuilt = rebuild_user_stats(user_ids or None)
+    click.echo(f"Rebuilt score aggregates for {rebuilt} users.")
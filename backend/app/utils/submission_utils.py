@@ -0,0 +1,176 @@
+import json
+import os
+import socket
+from datetime import datetime
+from redis.exceptions import ResponseError
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+from app.extensions import db
+from app.models import Score, Quiz, User
+from app.utils.cache_utils import get_redis, invalidate_cache_for_user_scores
+from app.utils.stats_utils import record_attempt
+from app.utils.leaderboard_utils import sync_leaderboard
+
+SUBMISSION_STREAM = "quiz_submissions"
+SUBMISSION_GROUP = "score_writers"
+SUBMISSION_SEEN_TTL = 86400  # How long a submission id is remembered for deduplication
+PENDING_SCORE_TTL = 86400
+CLAIM_IDLE_MS = 60000  # Entries read by a consumer that died are re-claimed after this long
+
+# Accept a submission id once: mark it seen, expose it as pending and append it to the stream, atomically.
+# A submission id seen before returns the submission accepted under it instead.
+_ENQUEUE_SUBMISSION_SCRIPT = """
+local seen = redis.call('GET', KEYS[1])
+if seen then
+    return seen
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('HSET', KEYS[2], ARGV[3], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+redis.call('XADD', KEYS[3], '*', 'submission', ARGV[1])
+return false
+"""
+
+# Drop a user's pending entry for a quiz only if it still belongs to the flushed submission
+_CLEAR_PENDING_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if current and cjson.decode(current)['submission_id'] == ARGV[2] then
+    return redis.call('HDEL', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+
+def submission_seen_key(user_id, submission_id):
+    """Submission ids are chosen by clients, so they are only unique per user."""
+    return f"submission_seen:{user_id}:{submission_id}"
+
+
+def pending_scores_key(user_id):
+    return f"pending_scores:{user_id}"
+
+
+def enqueue_submission(submission):
+    """
+    Append a graded submission to the stream and expose it to QuizResultResource
+    until it is flushed. Returns None once accepted, or the submission the user
+    already sent under this submission id.
+    """
+    enqueue = get_redis().register_script(_ENQUEUE_SUBMISSION_SCRIPT)
+    accepted = enqueue(
+        keys=[submission_seen_key(submission["user_id"], submission["submission_id"]),
+              pending_scores_key(submission["user_id"]), SUBMISSION_STREAM],
+        args=[json.dumps(submission), SUBMISSION_SEEN_TTL, submission["quiz_id"], PENDING_SCORE_TTL]
+    )
+    return json.loads(accepted) if accepted else None
+
+
+def get_pending_score(user_id, quiz_id):
+    """The user's latest accepted-but-unflushed submission for a quiz, if any."""
+    blob = get_redis().hget(pending_scores_key(user_id), quiz_id)
+    if blob is None:
+        return None
+    pending = json.loads(blob)
+    pending["attempted_at"] = datetime.fromisoformat(pending["attempted_at"])
+    return pending
+
+
+def _ensure_group(redis):
+    try:
+        redis.xgroup_create(SUBMISSION_STREAM, SUBMISSION_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def _write_batch(redis, entries):
+    """Insert one batch of stream entries in a single transaction, then acknowledge them."""
+    message_ids = [message_id for message_id, _ in entries]
+    submissions = [json.loads(fields["submission"]) for _, fields in entries if fields]
+
+    submission_ids = {s["submission_id"] for s in submissions}
+    quiz_ids = {s["quiz_id"] for s in submissions}
+    user_ids = {s["user_id"] for s in submissions}
+
+    # A retried flush may find some of these already committed
+    written = {
+        (user_id, submission_id) for user_id, submission_id in
+        db.session.query(Score.user_id, Score.submission_id).filter(Score.submission_id.in_(submission_ids))
+    } if submission_ids else set()
+    quizzes = {
+        quiz.id: quiz for quiz in
+        Quiz.query.options(joinedload(Quiz.chapter)).filter(Quiz.id.in_(quiz_ids))
+    } if quiz_ids else {}
+    existing_users = {
+        user_id for user_id, in db.session.query(User.id).filter(User.id.in_(user_ids))
+    } if user_ids else set()
+
+    rows = []
+    touched_users = set()
+    for submission in submissions:
+        quiz = quizzes.get(submission["quiz_id"])
+        # Skip duplicates and submissions whose quiz or user was deleted before the flush
+        key = (submission["user_id"], submission["submission_id"])
+        if key in written or quiz is None or submission["user_id"] not in existing_users:
+            continue
+        written.add(key)
+
+        attempted_at = datetime.fromisoformat(submission["attempted_at"])
+        rows.append({
+            "quiz_id": quiz.id,
+            "user_id": submission["user_id"],
+            "total_scored": submission["total_scored"],
+            "time_taken": submission["time_taken"],
+            "time_stamp_of_attempt": attempted_at,
+            "submission_id": submission["submission_id"],
+        })
+        record_attempt(submission["user_id"], quiz, submission["total_scored"],
+                       submission["total_questions"], submission["time_taken"], attempted_at)
+        touched_users.add(submission["user_id"])
+
+    if rows:
+        db.session.execute(insert(Score), rows)
+    db.session.commit()
+
+    pipe = redis.pipeline()
+    pipe.xack(SUBMISSION_STREAM, SUBMISSION_GROUP, *message_ids)
+    pipe.xdel(SUBMISSION_STREAM, *message_ids)
+    pipe.execute()
+
+    clear_pending = redis.register_script(_CLEAR_PENDING_SCRIPT)
+    for submission in submissions:
+        clear_pending(keys=[pending_scores_key(submission["user_id"])],
+                      args=[submission["quiz_id"], submission["submission_id"]])
+
+    sync_leaderboard(touched_users)
+    invalidate_cache_for_user_scores(touched_users)
+    return len(rows)
+
+
+def flush_submissions(batch_size=500, max_batches=20):
+    """
+    Drain the submission stream into the Score table, batch_size rows per commit.
+    Returns the number of scores written.
+    """
+    redis = get_redis()
+    _ensure_group(redis)
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    written = 0
+
+    try:
+        claimed = redis.xautoclaim(SUBMISSION_STREAM, SUBMISSION_GROUP, consumer,
+                                   min_idle_time=CLAIM_IDLE_MS, count=batch_size)[1]
+        if claimed:
+            written += _write_batch(redis, claimed)
+
+        for _ in range(max_batches):
+            response = redis.xreadgroup(SUBMISSION_GROUP, consumer, {SUBMISSION_STREAM: ">"}, count=batch_size)
+            if not response or not response[0][1]:
+                break
+            written += _write_batch(redis, response[0][1])
+    except Exception:
+        # Unacknowledged entries stay pending and are re-claimed on a later run
+        db.session.rollback()
+        raise
+
+    return written
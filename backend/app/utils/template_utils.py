@@ -0,0 +1,15 @@
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+import os
+
+# One Jinja2 environment per worker for email bodies and PDF reports.
+# Templates are compiled on first use and cached, auto_reload=False skips the per-render mtime check.
+template_env = Environment(
+    loader=FileSystemLoader(os.path.join(os.path.dirname(__file__), '..', 'templates')),
+    autoescape=select_autoescape(['html', 'xml']),
+    auto_reload=False
+)
+
+def render_template(template_name, **context):
+    """Render Jinja2 template."""
+    template = template_env.get_template(template_name)
+    return template.render(context)
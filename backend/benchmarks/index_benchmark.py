@@ -0,0 +1,211 @@
+"""
+Query-plan and latency benchmark for the hot-path indexes.
+
+Seeds a throwaway SQLite database (1M scores by default), runs the
+dashboard, summary, reminder and export queries without secondary
+indexes, then creates the model indexes and runs them again.
+
+Usage (from backend/):
+    python -m benchmarks.index_benchmark
+    python -m benchmarks.index_benchmark --scores 200000 --repeat 20
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, date
+
+from sqlalchemy import create_engine, text
+
+from app.extensions import db
+import app.models  # noqa: F401  (registers the tables on db.metadata)
+
+
+QUERIES = {
+    "dashboard: upcoming quizzes": (
+        "SELECT id, name, due_date FROM quiz WHERE due_date > :now ORDER BY due_date ASC LIMIT 3"
+    ),
+    "summary: score trend": (
+        "SELECT s.time_stamp_of_attempt, s.total_scored, q.question_count "
+        "FROM score s JOIN quiz q ON q.id = s.quiz_id "
+        "WHERE s.user_id = :user_id ORDER BY s.time_stamp_of_attempt"
+    ),
+    "summary: weekly attempts": (
+        "SELECT date(time_stamp_of_attempt), count(id) FROM score "
+        "WHERE user_id = :user_id AND time_stamp_of_attempt >= :week_ago "
+        "GROUP BY date(time_stamp_of_attempt)"
+    ),
+    "quiz result: latest attempt": (
+        "SELECT id, total_scored FROM score WHERE user_id = :user_id AND quiz_id = :quiz_id "
+        "ORDER BY time_stamp_of_attempt DESC LIMIT 1"
+    ),
+    "admin summary: attempts per day": (
+        "SELECT date(time_stamp_of_attempt), count(id) FROM score "
+        "WHERE time_stamp_of_attempt >= :week_ago GROUP BY date(time_stamp_of_attempt)"
+    ),
+    "reminder: eligible users": (
+        "SELECT id FROM user WHERE is_verified = 1 AND status = 'ACTIVE' AND role = 'USER'"
+    ),
+    "reminder: sent today": (
+        "SELECT id FROM reminder_log WHERE user_id = :user_id AND reminder_date = :today LIMIT 1"
+    ),
+    "export: user scores": (
+        "SELECT id, quiz_id, total_scored, time_stamp_of_attempt FROM score "
+        "WHERE user_id = :user_id ORDER BY time_stamp_of_attempt DESC"
+    ),
+    "export: latest job": (
+        "SELECT id, status FROM export_job WHERE user_id = :user_id ORDER BY created_at DESC LIMIT 1"
+    ),
+}
+
+
+def seed(engine, n_scores, n_users, n_quizzes, batch=50000):
+    rng = random.Random(42)
+    now = datetime.now()
+
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO subject (id, name) VALUES (1, 'Bench')"))
+        conn.execute(text("INSERT INTO chapter (id, subject_id, name) VALUES (1, 1, 'Bench')"))
+
+        conn.execute(
+            text(
+                "INSERT INTO user (id, username, password_hash, full_name, role, status, "
+                "created_at, notifications_enabled, is_verified) "
+                "VALUES (:id, :username, 'x', :full_name, :role, :status, :created_at, 1, :is_verified)"
+            ),
+            [
+                {
+                    "id": i,
+                    "username": f"user{i}@example.com",
+                    "full_name": f"User {i}",
+                    "role": "ADMIN" if i == 1 else "USER",
+                    "status": "ACTIVE" if rng.random() < 0.9 else "SUSPENDED",
+                    "created_at": now - timedelta(days=rng.randint(0, 365)),
+                    "is_verified": rng.random() < 0.8,
+                }
+                for i in range(1, n_users + 1)
+            ]
+        )
+
+        conn.execute(
+            text(
+                "INSERT INTO quiz (id, name, chapter_id, date_of_quiz, due_date, time_duration, "
+                "date_created, question_count) "
+                "VALUES (:id, :name, 1, :date_of_quiz, :due_date, '00:30:00', :date_of_quiz, 10)"
+            ),
+            [
+                {
+                    "id": i,
+                    "name": f"Quiz {i}",
+                    "date_of_quiz": now + timedelta(days=rng.randint(-365, 60)),
+                    "due_date": now + timedelta(days=rng.randint(-300, 90)),
+                }
+                for i in range(1, n_quizzes + 1)
+            ]
+        )
+
+        insert_score = text(
+            "INSERT INTO score (quiz_id, user_id, time_stamp_of_attempt, total_scored, time_taken) "
+            "VALUES (:quiz_id, :user_id, :ts, :total_scored, :time_taken)"
+        )
+        for start in range(0, n_scores, batch):
+            conn.execute(insert_score, [
+                {
+                    "quiz_id": rng.randint(1, n_quizzes),
+                    "user_id": rng.randint(2, n_users),
+                    "ts": now - timedelta(minutes=rng.randint(0, 525600)),
+                    "total_scored": rng.randint(0, 10),
+                    "time_taken": rng.uniform(30, 1800),
+                }
+                for _ in range(min(batch, n_scores - start))
+            ])
+
+        conn.execute(
+            text("INSERT INTO reminder_log (user_id, reminder_date, sent_at) VALUES (:user_id, :d, :d)"),
+            [
+                {"user_id": rng.randint(2, n_users), "d": date.today() - timedelta(days=rng.randint(0, 60))}
+                for _ in range(n_users * 10)
+            ]
+        )
+        conn.execute(
+            text("INSERT INTO export_job (user_id, status, created_at) VALUES (:user_id, 'completed', :created_at)"),
+            [
+                {"user_id": rng.randint(2, n_users), "created_at": now - timedelta(minutes=rng.randint(0, 525600))}
+                for _ in range(n_users * 2)
+            ]
+        )
+
+
+def run_queries(engine, params, repeat):
+    results = {}
+    with engine.connect() as conn:
+        for label, sql in QUERIES.items():
+            plan = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            results[label] = (" | ".join(row[-1] for row in plan), statistics.median(timings))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scores", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--quizzes", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)  # SQLite treats the empty file as a new database
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        db.metadata.create_all(engine)
+        indexes = [index for table in db.metadata.sorted_tables for index in table.indexes]
+        for index in indexes:
+            index.drop(engine)
+
+        print(f"Seeding {args.scores:,} scores for {args.users:,} users and {args.quizzes:,} quizzes...")
+        start = time.perf_counter()
+        seed(engine, args.scores, args.users, args.quizzes)
+        print(f"Seeded in {time.perf_counter() - start:.1f}s\n")
+
+        params = {
+            "now": datetime.now(),
+            "week_ago": datetime.now() - timedelta(days=7),
+            "today": date.today(),
+            "user_id": args.users // 2,
+            "quiz_id": args.quizzes // 2,
+        }
+
+        before = run_queries(engine, params, args.repeat)
+
+        start = time.perf_counter()
+        for index in indexes:
+            index.create(engine)
+        with engine.connect() as conn:
+            conn.execute(text("ANALYZE"))
+        print(f"Created {len(indexes)} indexes in {time.perf_counter() - start:.1f}s\n")
+
+        after = run_queries(engine, params, args.repeat)
+
+        for label in QUERIES:
+            plan_before, ms_before = before[label]
+            plan_after, ms_after = after[label]
+            speedup = ms_before / ms_after if ms_after else float("inf")
+            print(label)
+            print(f"  before: {ms_before:9.3f} ms  {plan_before}")
+            print(f"  after:  {ms_after:9.3f} ms  {plan_after}")
+            print(f"  speedup: {speedup:.1f}x\n")
+    finally:
+        engine.dispose()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Throughput benchmark for monthly report PDF rendering.
+
+Renders the same monthly_report.html contexts with xhtml2pdf in a process
+pool configured like celery_pdf_worker.py (prefork processes with an
+address space cap, recycled after a number of renders) at 1, 4 and 8
+processes, and reports PDFs per second.
+Throughput only scales up to the number of CPU cores.
+
+Usage (from backend/):
+    python -m benchmarks.pdf_benchmark
+    python -m benchmarks.pdf_benchmark --reports 200 --quizzes 40 --processes 1 2 4 8
+"""
+import argparse
+import os
+import resource
+import time
+from multiprocessing import Pool
+
+from app.utils.pdf_utils import html_to_pdf
+from app.utils.template_utils import render_template
+
+
+def limit_memory(limit_mb):
+    limit = limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def report_html(i, quizzes):
+    return render_template("monthly_report.html", **{
+        "username": f"User {i}",
+        "month": "October 2026",
+        "quizzes": [
+            {"name": f"Quiz {n}", "date": f"2026-10-{n % 28 + 1:02d}", "score": round((i * n) % 100, 2)}
+            for n in range(quizzes)
+        ],
+        "total_quizzes": quizzes,
+        "average_score": 50.0,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=100)
+    parser.add_argument("--quizzes", type=int, default=20, help="Quiz rows per report")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--max-renders", type=int, default=50, help="Renders before a process is replaced")
+    parser.add_argument("--memory-mb", type=int, default=1024, help="Address space cap per process")
+    args = parser.parse_args()
+
+    htmls = [report_html(i, args.quizzes) for i in range(args.reports)]
+    print(f"{args.reports} reports with {args.quizzes} quiz rows each, {os.cpu_count()} CPUs\n")
+
+    start = time.perf_counter()
+    for html in htmls[:10]:
+        html_to_pdf(html)
+    inline = (time.perf_counter() - start) / 10
+    print(f"inline (no pool): {1 / inline:8.1f} PDFs/s")
+
+    baseline = None
+    for processes in args.processes:
+        # Same process model as the prefork PDF worker: capped memory, recycled after max_renders
+        with Pool(processes, initializer=limit_memory, initargs=(args.memory_mb,),
+                  maxtasksperchild=args.max_renders) as pool:
+            pool.map(html_to_pdf, htmls[:processes], chunksize=1)  # Warm up the processes
+            start = time.perf_counter()
+            sizes = [len(pdf) for pdf in pool.imap(html_to_pdf, htmls, chunksize=1)]
+            elapsed = time.perf_counter() - start
+
+        rate = len(sizes) / elapsed
+        baseline = baseline or rate
+        print(f"{processes} process(es): {rate:8.1f} PDFs/s  ({rate / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
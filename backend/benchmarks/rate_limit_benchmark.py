@@ -0,0 +1,85 @@
+"""
+Per-request overhead of the rate limiter.
+
+Counts the same stream of requests from a few clients against a Redis
+server with the old GET + INCR/SETEX limiter (two round trips, racy
+window reset) and with check_rate_limit in each mode, with and without
+the local allowance fast path. Limits are set high enough that every
+request is allowed, which is the common case.
+
+Usage (from backend/, with Redis running):
+    python -m benchmarks.rate_limit_benchmark
+    python -m benchmarks.rate_limit_benchmark --requests 20000 --clients 50 --host localhost --port 6379
+"""
+import argparse
+import time
+
+from flask import Flask
+from redis import Redis
+
+from app.utils import cache_utils
+
+
+def legacy_rate_limit(redis, key, limit, window):
+    """The limiter before the Lua scripts."""
+    current = redis.get(key)
+    if current:
+        if int(current) >= limit:
+            return False
+        redis.incr(key)
+    else:
+        redis.setex(key, window, 1)
+    return True
+
+
+def run(label, check, keys, requests):
+    start = time.perf_counter()
+    for i in range(requests):
+        check(keys[i % len(keys)])
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed / requests * 1e6:8.1f} us/request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=10, help="Distinct rate limit keys")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config.from_object("app.config.Config")
+    app.redis_client = Redis(
+        host=args.host or app.config["REDIS_HOST"],
+        port=args.port or app.config["REDIS_PORT"],
+        db=app.config["REDIS_DB"],
+        decode_responses=True
+    )
+    redis = app.redis_client
+    limit, window = args.requests * 2, 60
+
+    print(f"{args.requests} requests from {args.clients} clients")
+    with app.app_context():
+        def keys(name):
+            names = [f"rate_limit_bench:{name}:{client}" for client in range(args.clients)]
+            redis.delete(*names)
+            return names
+
+        run("GET + INCR/SETEX (before)", lambda key: legacy_rate_limit(redis, key, limit, window),
+            keys("legacy"), args.requests)
+
+        for mode in cache_utils.RATE_LIMIT_SCRIPTS:
+            app.config["RATE_LIMIT_LOCAL_FRACTION"] = 0
+            run(f"{mode}", lambda key: cache_utils.check_rate_limit(key, limit, window, mode),
+                keys(mode), args.requests)
+
+            app.config["RATE_LIMIT_LOCAL_FRACTION"] = 0.1
+            run(f"{mode} + local allowance", lambda key: cache_utils.check_rate_limit(key, limit, window, mode),
+                keys(f"{mode}:local"), args.requests)
+
+        redis.delete(*redis.keys("rate_limit_bench:*"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Throughput benchmark for the pooled SMTP mailer.
+
+Starts debug_smtp_server's DebugHandler on a free local port (or uses a
+running server with --port) and sends the same reminder emails twice:
+once with a fresh connection per message, the way send_email used to,
+and once through send_many over a single persistent session.
+
+Usage (from backend/):
+    python -m benchmarks.smtp_benchmark
+    python -m benchmarks.smtp_benchmark --messages 500
+    python -m benchmarks.smtp_benchmark --port 1025   # an already running debug_smtp_server.py
+"""
+import argparse
+import contextlib
+import io
+import smtplib
+import socket
+import time
+
+from flask import Flask
+
+from app.utils import email_utils
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def debug_server(port):
+    from aiosmtpd.controller import Controller
+    from debug_smtp_server import DebugHandler
+
+    controller = Controller(DebugHandler(), hostname="localhost", port=port)
+    controller.start()
+    try:
+        yield
+    finally:
+        controller.stop()
+
+
+def reminder(i):
+    return {
+        "to": f"user{i}@example.com",
+        "subject": "Reminder: Don't miss your next quiz!",
+        "template_name": "daily_reminder.html",
+        "context": {
+            "username": f"User {i}",
+            "quiz_title": "Bench Quiz",
+            "due_date": "January 01, 2030",
+            "quiz_url": "http://localhost:8080/user/quizzes",
+        },
+    }
+
+
+def send_unpooled(messages, config):
+    """The old send_email path: connect, EHLO, send and QUIT for every message."""
+    for msg in messages:
+        with smtplib.SMTP(config["MAIL_SERVER"], config["MAIL_PORT"]) as server:
+            server.ehlo()
+            server.send_message(msg)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--port", type=int, default=None, help="Use a debug server already listening here")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config.from_object("app.config.Config")
+    app.config.update(MAIL_SERVER="localhost", MAIL_PORT=args.port or free_port())
+
+    server = contextlib.nullcontext() if args.port else debug_server(app.config["MAIL_PORT"])
+
+    with app.app_context(), server:
+        config = email_utils.get_mail_config()
+        messages = [email_utils.build_message(**reminder(i)) for i in range(args.messages)]
+
+        # The debug handler prints every message, keep that out of the timings
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            send_unpooled(messages, config)
+            before = time.perf_counter() - start
+
+            start = time.perf_counter()
+            sent = email_utils.get_mailer().send_many(messages)
+            after = time.perf_counter() - start
+            email_utils.get_mailer().close()
+
+    print(f"{args.messages} messages to {config['MAIL_SERVER']}:{config['MAIL_PORT']}")
+    print(f"  connection per message: {before:7.3f}s  {args.messages / before:8.1f} msg/s")
+    print(f"  pooled send_many:       {after:7.3f}s  {sent / after:8.1f} msg/s")
+    print(f"  speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
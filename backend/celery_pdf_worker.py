@@ -0,0 +1,26 @@
+import resource
+from celery.signals import worker_process_init
+from app import create_app, create_celery
+
+app = create_app()
+celery = create_celery(app)
+
+
+@worker_process_init.connect
+def limit_render_memory(**kwargs):
+    # A runaway render fails with MemoryError instead of exhausting the host
+    limit = app.config['PDF_WORKER_MEMORY_LIMIT_MB'] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+if __name__ == '__main__':
+    # Dedicated worker for PDF rendering, processes are replaced after PDF_WORKER_MAX_RENDERS renders
+    # Command: python celery_pdf_worker.py
+    celery.worker_main(argv=[
+        'worker',
+        '--loglevel=info',
+        '--hostname=pdf@%h',
+        f"--queues={app.config['PDF_RENDER_QUEUE'] or 'pdf'}",
+        f"--concurrency={app.config['PDF_WORKER_CONCURRENCY']}",
+        f"--max-tasks-per-child={app.config['PDF_WORKER_MAX_RENDERS']}",
+    ])
@@ -0,0 +1,35 @@
+"""report_run progress table
+
+Revision ID: 2f6b9e3d8a15
+Revises: e1b4d7a92c6f
+Create Date: 2026-10-18 14:36:52.117430
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f6b9e3d8a15'
+down_revision = 'e1b4d7a92c6f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('report_run',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('status', sa.Enum('running', 'completed', name='reportrunstatus'), nullable=False),
+    sa.Column('total_users', sa.Integer(), nullable=False),
+    sa.Column('sent_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('report_run')
+    sa.Enum(name='reportrunstatus').drop(op.get_bind(), checkfirst=True)
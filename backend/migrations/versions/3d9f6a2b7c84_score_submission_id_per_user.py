@@ -0,0 +1,28 @@
+"""score submission_id unique per user
+
+Revision ID: 3d9f6a2b7c84
+Revises: 8c4a1f6e2d97
+Create Date: 2026-10-18 18:41:27.905163
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d9f6a2b7c84'
+down_revision = '8c4a1f6e2d97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('score', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_score_submission_id', type_='unique')
+        batch_op.create_unique_constraint('uq_score_user_id_submission_id', ['user_id', 'submission_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('score', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_score_user_id_submission_id', type_='unique')
+        batch_op.create_unique_constraint('uq_score_submission_id', ['submission_id'])
@@ -0,0 +1,32 @@
+"""quiz question_count
+
+Revision ID: 4e8a1c7f2b90
+Revises: 9b13176deb35
+Create Date: 2026-10-18 11:02:37.906114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e8a1c7f2b90'
+down_revision = '9b13176deb35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('question_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the existing questions
+    op.execute(
+        "UPDATE quiz SET question_count = "
+        "(SELECT COUNT(*) FROM question WHERE question.quiz_id = quiz.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.drop_column('question_count')
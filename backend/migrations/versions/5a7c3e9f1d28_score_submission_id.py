@@ -0,0 +1,28 @@
+"""score submission_id
+
+Revision ID: 5a7c3e9f1d28
+Revises: 7d2e5b8c1a43
+Create Date: 2026-10-18 13:02:41.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a7c3e9f1d28'
+down_revision = '7d2e5b8c1a43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('score', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('submission_id', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_score_submission_id', ['submission_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('score', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_score_submission_id', type_='unique')
+        batch_op.drop_column('submission_id')
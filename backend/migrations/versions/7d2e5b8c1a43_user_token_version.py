@@ -0,0 +1,26 @@
+"""user token_version
+
+Revision ID: 7d2e5b8c1a43
+Revises: c3f9d2a4e6b1
+Create Date: 2026-10-18 12:08:19.552764
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2e5b8c1a43'
+down_revision = 'c3f9d2a4e6b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
@@ -0,0 +1,31 @@
+"""monthly_report latest pdf per user
+
+Revision ID: 8c4a1f6e2d97
+Revises: 2f6b9e3d8a15
+Create Date: 2026-10-18 16:12:05.381904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4a1f6e2d97'
+down_revision = '2f6b9e3d8a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('monthly_report',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('pdf_key', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('monthly_report')
@@ -0,0 +1,49 @@
+"""user stats aggregates
+
+Revision ID: 9b13176deb35
+Revises: 9253450206cc
+Create Date: 2026-10-18 10:40:12.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b13176deb35'
+down_revision = '9253450206cc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_stats_aggregate',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('attempt_count', sa.Integer(), nullable=False),
+    sa.Column('percentage_sum', sa.Float(), nullable=False),
+    sa.Column('total_time_taken', sa.Float(), nullable=False),
+    sa.Column('high_count', sa.Integer(), nullable=False),
+    sa.Column('moderate_count', sa.Integer(), nullable=False),
+    sa.Column('low_count', sa.Integer(), nullable=False),
+    sa.Column('last_quiz_id', sa.Integer(), nullable=True),
+    sa.Column('last_percentage', sa.Float(), nullable=True),
+    sa.Column('last_attempt_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['last_quiz_id'], ['quiz.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('user_subject_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('attempt_count', sa.Integer(), nullable=False),
+    sa.Column('percentage_sum', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['subject_id'], ['subject.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'subject_id')
+    )
+    # Existing scores are backfilled with `flask rebuild-user-stats`
+
+
+def downgrade():
+    op.drop_table('user_subject_stats')
+    op.drop_table('user_stats_aggregate')
@@ -0,0 +1,51 @@
+"""hot query indexes
+
+Revision ID: c3f9d2a4e6b1
+Revises: 4e8a1c7f2b90
+Create Date: 2026-10-18 11:24:51.330842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f9d2a4e6b1'
+down_revision = '4e8a1c7f2b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-user score history (dashboard, summary, export, monthly report)
+    op.create_index('ix_score_user_id_time_stamp', 'score', ['user_id', 'time_stamp_of_attempt'], unique=False)
+    # Attempts on a quiz, and a user's latest attempt on a quiz
+    op.create_index('ix_score_quiz_id_user_id', 'score', ['quiz_id', 'user_id', 'time_stamp_of_attempt'], unique=False)
+    # Platform-wide attempts per day
+    op.create_index('ix_score_time_stamp_of_attempt', 'score', ['time_stamp_of_attempt'], unique=False)
+
+    op.create_index('ix_quiz_chapter_id', 'quiz', ['chapter_id'], unique=False)
+    op.create_index('ix_quiz_due_date', 'quiz', ['due_date'], unique=False)
+    op.create_index('ix_quiz_date_of_quiz', 'quiz', ['date_of_quiz'], unique=False)
+    op.create_index('ix_question_quiz_id', 'question', ['quiz_id'], unique=False)
+    op.create_index('ix_chapter_subject_id', 'chapter', ['subject_id'], unique=False)
+
+    op.create_index('ix_reminder_log_user_id_reminder_date', 'reminder_log', ['user_id', 'reminder_date'], unique=False)
+    op.create_index('ix_export_job_user_id_created_at', 'export_job', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_user_is_verified_status_role', 'user', ['is_verified', 'status', 'role'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_is_verified_status_role', table_name='user')
+    op.drop_index('ix_export_job_user_id_created_at', table_name='export_job')
+    op.drop_index('ix_reminder_log_user_id_reminder_date', table_name='reminder_log')
+
+    op.drop_index('ix_chapter_subject_id', table_name='chapter')
+    op.drop_index('ix_question_quiz_id', table_name='question')
+    op.drop_index('ix_quiz_date_of_quiz', table_name='quiz')
+    op.drop_index('ix_quiz_due_date', table_name='quiz')
+    op.drop_index('ix_quiz_chapter_id', table_name='quiz')
+
+    op.drop_index('ix_score_time_stamp_of_attempt', table_name='score')
+    op.drop_index('ix_score_quiz_id_user_id', table_name='score')
+    op.drop_index('ix_score_user_id_time_stamp', table_name='score')
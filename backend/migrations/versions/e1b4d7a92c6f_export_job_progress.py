@@ -0,0 +1,36 @@
+"""export_job kind and progress
+
+Revision ID: e1b4d7a92c6f
+Revises: 5a7c3e9f1d28
+Create Date: 2026-10-18 13:47:05.904116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1b4d7a92c6f'
+down_revision = '5a7c3e9f1d28'
+branch_labels = None
+depends_on = None
+
+export_kind = sa.Enum('user_scores', 'all_scores', name='exportkind')
+
+
+def upgrade():
+    export_kind.create(op.get_bind(), checkfirst=True)
+    with op.batch_alter_table('export_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('kind', export_kind, server_default='user_scores', nullable=False))
+        batch_op.add_column(sa.Column('total_parts', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('completed_parts', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('row_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('export_job', schema=None) as batch_op:
+        batch_op.drop_column('row_count')
+        batch_op.drop_column('completed_parts')
+        batch_op.drop_column('total_parts')
+        batch_op.drop_column('kind')
+    export_kind.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,69 @@
+import os
+from datetime import datetime, timedelta, time
+
+import fakeredis
+import pytest
+
+# Read by app.config when it is first imported, Flask-SQLAlchemy shares one in-memory connection per app
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+import app as app_package
+from app.api import register_api
+from app.extensions import db
+from app.models import User, Subject, Chapter, Quiz, Question, UserStatusEnum
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # Tables don't exist until create_all below
+    monkeypatch.setattr(app_package, 'initialize_admin', lambda: None)
+    app = app_package.create_app()
+    app.config.update(TESTING=True, CACHE_L1_MAX_BYTES=0)
+    app.redis_client = fakeredis.FakeRedis(decode_responses=True)
+    app_package.create_celery(app).conf.task_always_eager = True
+    register_api(app)
+
+    # Requests push their own app context, so each gets a fresh g
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app, client):
+    """Create a verified user and return the Authorization header of their session."""
+    def make_user(username):
+        with app.app_context():
+            user = User(username=username, full_name=username, is_verified=True, status=UserStatusEnum.ACTIVE)
+            user.set_password('password')
+            db.session.add(user)
+            db.session.commit()
+        response = client.post('/api/auth/login', json={'username': username, 'password': 'password'})
+        assert response.status_code == 200, response.get_json()
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    return make_user
+
+
+@pytest.fixture
+def quiz_id(app):
+    """Id of an open quiz with four questions, each answered correctly by option 1."""
+    with app.app_context():
+        subject = Subject(name='Maths')
+        chapter = Chapter(name='Algebra', subject=subject)
+        now = datetime.now()
+        quiz = Quiz(name='Quiz 1', chapter=chapter, date_of_quiz=now - timedelta(days=1),
+                    due_date=now + timedelta(days=1), time_duration=time(0, 10), question_count=4)
+        db.session.add(quiz)
+        db.session.flush()
+        for i in range(4):
+            db.session.add(Question(quiz_id=quiz.id, question_statement=f'Question {i}', option1='a',
+                                    option2='b', option3='c', option4='d', correct_option=1))
+        db.session.commit()
+        return quiz.id
@@ -0,0 +1,119 @@
+import pytest
+
+from app.models import Score
+from app.utils import submission_utils
+from app.utils.submission_utils import flush_submissions, SUBMISSION_STREAM, SUBMISSION_GROUP
+
+
+def answers(correct, total=4):
+    """Answers to the quiz fixture's questions, the first `correct` of them right."""
+    return [{'question_id': i + 1, 'selected_option': 1 if i < correct else 2} for i in range(total)]
+
+
+def submit(client, headers, quiz_id, correct, submission_id=None, total=4):
+    body = {'answers': answers(correct, total), 'time_taken': 30}
+    if submission_id is not None:
+        body['submission_id'] = submission_id
+    return client.post(f'/api/user/submit_quiz/{quiz_id}', json=body, headers=headers)
+
+
+def result(client, headers, quiz_id):
+    return client.get(f'/api/user/quiz_result/{quiz_id}', headers=headers).get_json()['score']
+
+
+def stored_scores(app):
+    with app.app_context():
+        return sorted((score.user_id, score.submission_id, score.total_scored) for score in Score.query)
+
+
+def flush(app):
+    with app.app_context():
+        return flush_submissions()
+
+
+@pytest.fixture
+def write_behind(app):
+    app.config['SUBMISSION_WRITE_BEHIND'] = True
+
+
+def test_retry_returns_stored_result(app, client, make_user, quiz_id):
+    user = make_user('u@example.com')
+
+    first = submit(client, user, quiz_id, correct=3, submission_id='attempt-1')
+    retry = submit(client, user, quiz_id, correct=1, submission_id='attempt-1', total=1)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.get_json()['score_summary']['total_scored'] == 3
+    assert stored_scores(app) == [(1, 'attempt-1', 3)]
+
+
+def test_submission_id_is_scoped_to_the_user(app, client, make_user, quiz_id):
+    u, v = make_user('u@example.com'), make_user('v@example.com')
+
+    submit(client, u, quiz_id, correct=3, submission_id='1')
+    response = submit(client, v, quiz_id, correct=1, submission_id='1')
+
+    assert response.status_code == 200
+    assert response.get_json()['score_summary']['total_scored'] == 1
+    assert stored_scores(app) == [(1, '1', 3), (2, '1', 1)]
+    assert result(client, u, quiz_id) == '3/4'
+    assert result(client, v, quiz_id) == '1/4'
+
+
+def test_write_behind_reads_pending_result_then_flushes(app, client, make_user, quiz_id, write_behind):
+    user = make_user('u@example.com')
+
+    response = submit(client, user, quiz_id, correct=3, submission_id='attempt-1')
+    assert response.status_code == 202
+    assert stored_scores(app) == []
+    assert result(client, user, quiz_id) == '3/4'
+
+    assert flush(app) == 1
+    assert stored_scores(app) == [(1, 'attempt-1', 3)]
+    assert result(client, user, quiz_id) == '3/4'
+
+
+def test_write_behind_retry_returns_stored_result(app, client, make_user, quiz_id, write_behind):
+    user = make_user('u@example.com')
+
+    submit(client, user, quiz_id, correct=3, submission_id='attempt-1')
+    pending_retry = submit(client, user, quiz_id, correct=1, submission_id='attempt-1', total=1)
+    assert pending_retry.status_code == 202
+    assert pending_retry.get_json()['score_summary']['total_scored'] == 3
+    assert pending_retry.get_json()['score_summary']['attempted'] == 4
+
+    assert flush(app) == 1
+    flushed_retry = submit(client, user, quiz_id, correct=1, submission_id='attempt-1', total=1)
+    assert flushed_retry.status_code == 200
+    assert flushed_retry.get_json()['score_summary']['total_scored'] == 3
+    assert flush(app) == 0
+    assert stored_scores(app) == [(1, 'attempt-1', 3)]
+
+
+def test_write_behind_submission_id_is_scoped_to_the_user(app, client, make_user, quiz_id, write_behind):
+    u, v = make_user('u@example.com'), make_user('v@example.com')
+
+    submit(client, u, quiz_id, correct=3, submission_id='1')
+    response = submit(client, v, quiz_id, correct=1, submission_id='1')
+    assert response.status_code == 202
+    assert response.get_json()['score_summary']['total_scored'] == 1
+
+    assert flush(app) == 2
+    assert stored_scores(app) == [(1, '1', 3), (2, '1', 1)]
+
+
+def test_flush_reclaims_entries_of_a_dead_consumer(app, client, make_user, quiz_id, write_behind, monkeypatch):
+    user = make_user('u@example.com')
+    submit(client, user, quiz_id, correct=2, submission_id='attempt-1')
+
+    # A consumer reads the entry, then dies before writing it
+    redis = app.redis_client
+    submission_utils._ensure_group(redis)
+    redis.xreadgroup(SUBMISSION_GROUP, 'dead-consumer', {SUBMISSION_STREAM: '>'}, count=10)
+    assert flush(app) == 0
+
+    monkeypatch.setattr(submission_utils, 'CLAIM_IDLE_MS', 0)
+    assert flush(app) == 1
+    assert stored_scores(app) == [(1, 'attempt-1', 2)]
+    assert redis.xpending(SUBMISSION_STREAM, SUBMISSION_GROUP)['pending'] == 0
+    assert result(client, user, quiz_id) == '2/4'